@@ -1,9 +1,15 @@
 import hashlib
 import json
+import multiprocessing
+import queue
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Tuple, Dict
+from itertools import repeat
+from typing import List, Tuple, Dict, Optional, Iterable, Iterator, BinaryIO
 
+import numpy as np
 import unicodedata
 from pypdf import PdfReader
 import pytesseract
@@ -11,41 +17,162 @@ import pdfplumber
 import os
 import re
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Abaixo disso, extrair as páginas em paralelo custa mais (abrir o PDF em cada processo) do que ganha
+PAGINAS_MINIMAS_PARALELO = 32
+
+
+# Os três primeiros caracteres de cada mês são únicos (e cobrem variações como "março"/"marco")
+MESES = {
+    'jan': '01', 'fev': '02', 'mar': '03', 'abr': '04',
+    'mai': '05', 'jun': '06', 'jul': '07', 'ago': '08',
+    'set': '09', 'out': '10', 'nov': '11', 'dez': '12'
+}
+
+
+# ============================================================================
+# PADRÕES (compilados uma única vez, no carregamento do módulo)
+# ============================================================================
+
+# Marcadores estruturais do documento. Todos começam no início de uma linha.
+# PADRÃO MELHORADO: aceita I, l, 1, | (pipe) e variações
+ESTRUTURAS = {
+    'titulo': r'T[ÍIi|l1]TULO\s*([IVXLCDM|]+|[0-9]+)\s*[-–—]?\s*(.*?)$',
+    'capitulo': r'CAP[ÍIi|l1]TULO\s*([IVXLCDM|]+|[0-9]+)\s*[-–—]?\s*(.*?)$',
+    'secao': r'SE[CcGg][ÇçCcGg]?[ÃãAaOo][Oo]?\s*([IVXLCDM|]+|[0-9]+)\s*[-–—]?\s*(.*?)$',
+    'subsecao': r'SUBSE[CcGg][ÇçCcGg]?[ÃãAaOo][Oo]?\s*([IVXLCDM|]+|[0-9]+)\s*[-–—]?\s*(.*?)$',
+    # Padrão para identificar artigos (mantém o seu)
+    'artigo': r'(Art\.?\s*\d{1,4}[ººº°]?\.?|Artigo\s+\d{1,4}[ººº°]?\.?)',
+}
+
+# Todos os marcadores em um único padrão, para percorrer o texto uma só vez.
+# Cada alternativa fica dentro de um lookahead (não consome texto): assim um cabeçalho
+# cujo nome avança para a linha seguinte não esconde um artigo que comece nela.
+PADRAO_ESTRUTURA = re.compile(
+    r'(?m)^(?:' + '|'.join(f'(?=(?P<{nome}>{padrao}))' for nome, padrao in ESTRUTURAS.items()) + ')',
+    re.IGNORECASE
+)
+
+# Normalização do número do artigo
+PADRAO_ORDINAL = re.compile(r'[ºº°]')
+PADRAO_ESPACOS = re.compile(r'\s+')
+
+# Expressão para capturar "Art." ou "Artigo", seguidos de número e símbolo opcional º/°
+PADRAO_ARTIGO_SIMPLIFICADO = re.compile(r'(?m)^(Art(?:igo)?\.?\s*\d{1,3}\s*[º°]?)')
+
+PADRAO_NUMERO_ICA = re.compile(r'ICA\s+(\d+-\d+)', re.IGNORECASE)
+
+# Padrão: "DD DE MMMM DE AAAA"
+PADRAO_DATA = re.compile(r'(\d{1,2})\s+[Dd][Ee]\s+(\w+)\s+[Dd][Ee]\s+(\d{4})')
+
+# Indício de que o artigo revoga outro ICA ("Revoga", "Revogado", "Revogou"; "revoga" já cobre "revogado")
+PADRAO_INDICIO_REVOGACAO = re.compile(r'revog(?:a|ou)', re.IGNORECASE)
+
+PADRAO_REVOGACAO = re.compile(
+    r"""
+    [Rr]evog(?:ar|a-se)\s+a\s+Portaria\s+          # início da frase
+    (?P<orgao>[A-ZÇÕÉÊÂ]+\s*)?                    # órgão (ex: DECEA)
+    n[°º]?\s*                                     # símbolo de número (n°, nº, n2 etc.)
+    (?P<numero>[\d]+(?:\/[A-Z0-9]+)?)             # número e possível sufixo (801/ATAN3)
+    ,?\s*de\s*(?P<data>[\d]{1,2}\s+de\s+\w+\s+de\s+\d{4})  # data
+    (?:.*?(?:publicada\s+no.*?(?P<boletim>BCA|Boletim.*?)\s*(?:n[°º]?\s*[\d]+)?.*?)?)?
+    [\.;]?                                         # final opcional
+    """,
+    re.VERBOSE
+)
+
 
 class ICAJSONGenerator:
-    def __init__(self):
+    def __init__(self, debug: bool = False, extracao_workers: Optional[int] = None):
+        """
+        Args:
+            debug: Se True, mostra detalhes da análise de cada documento (mais lento em lotes grandes)
+            extracao_workers: Número de processos para extrair o texto dos PDFs grandes
+                (padrão: número de CPUs, até 8). Com 1, a extração é sequencial
+        """
+        self.debug = debug
+        self.extracao_workers = extracao_workers or min(os.cpu_count() or 1, 8)
+
         # self.input_dir = "ICAS"
         self.input_dir = r"C:\Coding\AirData\RepositorioSemantico\ICA_Extractor"
+        self.output_dir = r"C:\Coding\AirData\RepositorioSemantico\ICA_Extractor"
 
     def get_caminhos(self) -> list[str]:
         """Retorna uma lista com os caminhos completos de todos os arquivos dentro de um diretório."""
         # return [r'C:\Coding\AirData\RepositorioSemantico\ICA_Extractor\test.pdf']
         # return [r'C:\Coding\AirData\RepositorioSemantico\ICA_Extractor\ICA_grande.pdf']
         # return [r'C:\Coding\AirData\RepositorioSemantico\ICA_Extractor\ICA_medio.pdf']
-        extensoes = [".pdf"]
+        extensoes = (".pdf",)
         caminhos = []
-        for raiz, _, arquivos in os.walk(self.input_dir):
-            for arquivo in arquivos:
-                if extensoes:
+        # Mesma ordem do os.walk: os arquivos de cada diretório antes dos seus subdiretórios.
+        # O scandir já traz o tipo de cada entrada, sem um stat por arquivo
+        diretorios = [self.input_dir]
+        while diretorios:
+            subdiretorios = []
+            with os.scandir(diretorios.pop()) as entradas:
+                for entrada in entradas:
+                    if entrada.is_dir(follow_symlinks=False):
+                        subdiretorios.append(entrada.path)
                     # verifica se o arquivo termina com uma das extensões permitidas
-                    if not arquivo.lower().endswith(tuple(extensoes)):
-                        continue
-                caminhos.append(os.path.join(raiz, arquivo))
+                    elif entrada.name.lower().endswith(extensoes):
+                        caminhos.append(entrada.path)
+            diretorios.extend(reversed(subdiretorios))
         return caminhos
 
     def process_documents(self):
         print('-'*40)
         print('INICIANDO PROCESSO DE CRIAÇÂO DE JSONS')
         print(f'Busca por caminhos iniciada no diretório: {self.input_dir}')
-        print('Caminhos obtidos: ')
-        print(self.get_caminhos())
-        for i, file_path in enumerate(self.get_caminhos()):
+        caminhos = self.get_caminhos()
+        if self.debug:
+            print('Caminhos obtidos: ')
+            print(caminhos)
+
+        # Cria o diretório de saída uma única vez por execução, em vez de a cada documento salvo
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Um único pool de extração para todos os PDFs, criado aqui na thread principal.
+        # O contexto 'spawn' evita fazer fork de um processo que já tem threads
+        executor = None
+        if self.extracao_workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.extracao_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+        # Enquanto um documento é processado, o próximo já vai sendo lido em segundo plano
+        fila_textos = queue.Queue(maxsize=2)
+        threading.Thread(
+            target=self._carregar_textos,
+            args=(caminhos, fila_textos, executor, self.extracao_workers),
+            daemon=True
+        ).start()
+
+        try:
+            self._processar_textos(fila_textos)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        print('PROCESSO DE CRIAÇÂO DE JSONS ENCERRADO')
+        print('-'*40)
+
+    def _processar_textos(self, fila_textos: queue.Queue):
+        """Gera o JSON de cada documento lido pela thread de _carregar_textos."""
+        for i, (file_path, textos) in enumerate(iter(fila_textos.get, None)):
             print('-'*20)
             print(f'Repetição {i}')
             print(f'Caminho de arquivo: {file_path}')
 
-            # Textos separados por página
-            textos = extrair_texto_pdf(file_path)
+            # Erro na leitura do PDF é repassado pela fila
+            if isinstance(textos, Exception):
+                raise textos
 
             primeira_pagina = textos[0]
             # revogada = get_ica_revogado(primeira_pagina)
@@ -55,18 +182,37 @@ class ICAJSONGenerator:
             # Extrair data de publicação (você pode criar uma função específica para isso)
             data_publicacao = extrair_data_publicacao(primeira_pagina)
 
-            artigos_estruturados = extrair_artigos_estruturados(textos, numero_ica, data_publicacao)
+            artigos_estruturados = extrair_artigos_estruturados(textos, numero_ica, data_publicacao, self.debug)
 
             salvar_artigos_json(
                 artigos_estruturados,
-                fr"C:\Coding\AirData\RepositorioSemantico\ICA_Extractor\{numero_ica}.json",
+                os.path.join(self.output_dir, f"{numero_ica}.json"),
                 'legivel'
             )
 
             print('-'*20)
             break
-        print('PROCESSO DE CRIAÇÂO DE JSONS ENCERRADO')
-        print('-'*40)
+
+    @staticmethod
+    def _carregar_textos(
+            caminhos: List[str],
+            fila_textos: queue.Queue,
+            executor: Optional[ProcessPoolExecutor] = None,
+            max_workers: int = 1
+    ):
+        """
+        Extrai o texto de cada PDF (separado por página) e coloca na fila como (caminho, textos).
+
+        Em caso de erro, coloca a exceção no lugar dos textos e para. Ao final, coloca None na fila.
+        """
+        for file_path in caminhos:
+            try:
+                textos = extrair_texto_pdf(file_path, executor, max_workers)
+            except Exception as e:
+                fila_textos.put((file_path, e))
+                return
+            fila_textos.put((file_path, textos))
+        fila_textos.put(None)
 
 
 def extract_text_pypdf2(pdf_path):
@@ -77,12 +223,46 @@ def extract_text_pypdf2(pdf_path):
     return extracted_text
 
 
-def extrair_texto_pdf(caminho_pdf: str) -> List[str]:
-    """Extrai todo o texto de um arquivo PDF e retorna como uma única string."""
-    textos = []
+def extrair_texto_pdf(
+        caminho_pdf: str,
+        executor: Optional[ProcessPoolExecutor] = None,
+        max_workers: int = 1
+) -> List[str]:
+    """
+    Extrai o texto de um arquivo PDF, retornando uma string por página.
+
+    Com um pool de processos, as páginas de PDFs grandes são divididas em blocos contíguos e
+    extraídas em paralelo (a extração do pdfplumber é Python puro, então threads não ganhariam
+    nada por causa do GIL). PDFs com menos de PAGINAS_MINIMAS_PARALELO páginas são lidos aqui mesmo.
+
+    Args:
+        caminho_pdf: Caminho do arquivo PDF
+        executor: Pool de processos compartilhado entre os PDFs (None para extrair sequencialmente)
+        max_workers: Número de processos do pool (define em quantos blocos as páginas são divididas)
+    """
     with pdfplumber.open(caminho_pdf) as pdf:
+        total_paginas = len(pdf.pages)
+
+    max_workers = min(max_workers, total_paginas)
+    if executor is None or max_workers <= 1 or total_paginas < PAGINAS_MINIMAS_PARALELO:
+        return _extrair_paginas(caminho_pdf, 0, total_paginas)
+
+    # Blocos contíguos de páginas, um por processo, para manter a ordem ao juntar
+    tamanho_bloco = -(-total_paginas // max_workers)
+    inicios = range(0, total_paginas, tamanho_bloco)
+    fins = [min(inicio + tamanho_bloco, total_paginas) for inicio in inicios]
+    blocos = executor.map(_extrair_paginas, repeat(caminho_pdf), inicios, fins)
+    return [texto for bloco in blocos for texto in bloco]
+
+
+def _extrair_paginas(caminho_pdf: str, inicio: int, fim: int) -> List[str]:
+    """Extrai o texto das páginas [inicio, fim) de um PDF, com seu próprio handle do pdfplumber."""
+    textos = []
+    # O pdfplumber numera as páginas a partir de 1
+    with pdfplumber.open(caminho_pdf, pages=list(range(inicio + 1, fim + 1))) as pdf:
         for pagina in pdf.pages:
-            texto = pagina.extract_text() + "\n"
+            # Sem "\n" no final: as páginas já são unidas por "\n" em extrair_artigos_estruturados
+            texto = pagina.extract_text()
             textos.append(texto)
             # print(texto)
     return textos
@@ -90,13 +270,11 @@ def extrair_texto_pdf(caminho_pdf: str) -> List[str]:
 
 def extrair_texto_com_ocr(caminho_pdf: str) -> list[str]:
     """Extrai texto de um PDF, mesmo se as páginas forem imagens."""
-    texto_total = ""
     textos = []
     with pdfplumber.open(caminho_pdf) as pdf:
         for i, pagina in enumerate(pdf.pages):
             texto = pagina.extract_text()
             if texto and texto.strip():
-                texto_total += texto + "\n"
                 textos.append(texto + "\n")
             else:
                 # Faz OCR na imagem da página
@@ -105,51 +283,40 @@ def extrair_texto_com_ocr(caminho_pdf: str) -> list[str]:
                 # -c load_freq_dawg=1 -c load_system_dawg=1 faz o tesseract usar o dicionário.
                 config_tesseract_str = "-c preserve_interword_spaces=1 --psm 3 -c load_freq_dawg=1 -c load_system_dawg=1"
                 texto_ocr = pytesseract.image_to_string(imagem, lang='por', config=config_tesseract_str)
-                texto_total += texto_ocr + "\n"
                 textos.append(texto_ocr + '\n')
             print(f"Página {i+1} processada.")
-    # return texto_total
     return textos
 
 
-def get_ica_revogado(texto: str):
+def get_ica_revogado(texto: str, debug=False):
     # print(texto)
     # print(texto.__contains__('Art'))
     # print(type(texto))
     print('-'*40)
     print('INICIANDO PROCESSO DE BUSCA POR REVOGAÇÃO')
     art_revogacao = None
-    for num_art, texto_art in get_articles_simplificado(texto, True):
-        print('-'*20)
-        print(f'Artigo: {num_art}')
-        print(f'Conteúdo: \n{texto_art[:min(len(texto_art), 400)]}')  # limita até 400 caracteres (poluição visual)
+    for num_art, texto_art in get_articles_simplificado(texto, debug):
+        if debug:
+            print('-'*20)
+            print(f'Artigo: {num_art}')
+            print(f'Conteúdo: \n{texto_art[:min(len(texto_art), 400)]}')  # limita até 400 caracteres (poluição visual)
 
-        if any(value.lower() in texto_art.lower() for value in ['Revoga', 'Revogado', 'Revogou']):
-            print(f'Aqui é o artigo que revoga!!!! no artigo {num_art}')
+        if PADRAO_INDICIO_REVOGACAO.search(texto_art):
+            if debug:
+                print(f'Aqui é o artigo que revoga!!!! no artigo {num_art}')
             art_revogacao = (num_art, texto_art)
-        print('-'*20)
+
+        if debug:
+            print('-'*20)
 
     if not art_revogacao:
         print('ICA analisado não revoga nenhum outro ICA')
         print('-'*40)
         return None
 
-    padrao = re.compile(
-        r"""
-        [Rr]evog(?:ar|a-se)\s+a\s+Portaria\s+          # início da frase
-        (?P<orgao>[A-ZÇÕÉÊÂ]+\s*)?                    # órgão (ex: DECEA)
-        n[°º]?\s*                                     # símbolo de número (n°, nº, n2 etc.)
-        (?P<numero>[\d]+(?:\/[A-Z0-9]+)?)             # número e possível sufixo (801/ATAN3)
-        ,?\s*de\s*(?P<data>[\d]{1,2}\s+de\s+\w+\s+de\s+\d{4})  # data
-        (?:.*?(?:publicada\s+no.*?(?P<boletim>BCA|Boletim.*?)\s*(?:n[°º]?\s*[\d]+)?.*?)?)?
-        [\.;]?                                         # final opcional
-        """,
-        re.VERBOSE
-    )
-
     texto = texto.replace('\n','')
     resultados = []
-    for match in padrao.finditer(texto):
+    for match in PADRAO_REVOGACAO.finditer(texto):
         resultados.append({
             "orgao": match.group("orgao"),
             "numero": match.group("numero"),
@@ -157,8 +324,9 @@ def get_ica_revogado(texto: str):
             "boletim": match.group("boletim")
         })
 
-    for result in resultados:
-        print(result)
+    if debug:
+        for result in resultados:
+            print(result)
     return resultados
 
 
@@ -169,10 +337,7 @@ def get_articles_simplificado(texto: str, debug=False) -> list[str]:
     """
     # texto = limpar_texto_ocr(texto)
 
-    # Expressão para capturar "Art." ou "Artigo", seguidos de número e símbolo opcional º/°
-    padrao = r'(?m)^(Art(?:igo)?\.?\s*\d{1,3}\s*[º°]?)'
-
-    matches = list(re.finditer(padrao, texto))
+    matches = list(PADRAO_ARTIGO_SIMPLIFICADO.finditer(texto))
 
     if debug:
         print(f"🔍 {len(matches)} artigos encontrados")
@@ -194,8 +359,7 @@ def extrair_numero_ica(texto: str) -> str:
     """
     Extrai o número do ICA da primeira página.
     """
-    padrao = re.compile(r'ICA\s+(\d+-\d+)', re.IGNORECASE)
-    match = padrao.search(texto)
+    match = PADRAO_NUMERO_ICA.search(texto)
     if match:
         return f"ICA {match.group(1)}"
     return "ICA Desconhecido"
@@ -205,158 +369,128 @@ def extrair_data_publicacao(texto: str) -> str:
     """
     Extrai a data de publicação do documento.
     """
-    # Padrão: "DD DE MMMM DE AAAA"
-    padrao = re.compile(r'(\d{1,2})\s+[Dd][Ee]\s+(\w+)\s+[Dd][Ee]\s+(\d{4})')
-    match = padrao.search(texto)
+    match = PADRAO_DATA.search(texto)
 
     if match:
         dia = match.group(1).zfill(2)
-        mes_texto = match.group(2).lower()
+        mes_texto = match.group(2)
         ano = match.group(3)
 
-        meses = {
-            'janeiro': '01', 'fevereiro': '02', 'março': '03', 'abril': '04',
-            'maio': '05', 'junho': '06', 'julho': '07', 'agosto': '08',
-            'setembro': '09', 'outubro': '10', 'novembro': '11', 'dezembro': '12'
-        }
-
-        mes = meses.get(mes_texto, '01')
+        mes = MESES.get(mes_texto[:3].lower(), '01')
         return f"{dia}-{mes}-{ano}"
 
     return datetime.now().strftime("%d-%m-%Y")
 
 
-def extrair_artigos_estruturados(textos: List[str], numero_ica: str, data_publicacao: str) -> List[Dict]:
+def extrair_artigos_estruturados(
+        textos: List[str],
+        numero_ica: str,
+        data_publicacao: str,
+        debug: bool = False
+) -> Iterator[Dict]:
     """
     Extrai todos os artigos de um documento ICA com seu contexto hierárquico completo.
 
+    É um gerador: cada artigo é montado só quando pedido, para poder ser gravado em disco
+    sem manter a lista inteira em memória.
+
     Args:
         textos: Lista de strings, cada uma representando o texto de uma página
         numero_ica: Número do ICA (ex: "ICA 96-1")
         data_publicacao: Data de publicação no formato "DD-MM-AAAA"
+        debug: Se True, mostra os cabeçalhos e artigos encontrados
 
-    Returns:
-        Lista de dicionários com a estrutura padronizada dos artigos
+    Yields:
+        Dicionários com a estrutura padronizada dos artigos, na ordem do documento
     """
 
-    # Juntar todas as páginas em um único texto
+    # Juntar todas as páginas em um único texto: um cabeçalho no fim de uma página pode
+    # ter o nome na página seguinte, então a busca não pode ser feita página por página
     texto_completo = "\n".join(textos)
 
-    # PADRÃO MELHORADO: aceita I, l, 1, | (pipe) e variações
-    padrao_titulo = re.compile(
-        r'(?m)^T[ÍIi|l1]TULO\s*([IVXLCDM|]+|[0-9]+)\s*[-–—]?\s*(.*?)$',
-        re.IGNORECASE
-    )
+    # Encontrar todas as ocorrências de títulos, capítulos, seções, subseções e artigos
+    cabecalhos = {nome: [] for nome in ESTRUTURAS if nome != 'artigo'}
+    artigos = []
+    fim_anterior = dict.fromkeys(ESTRUTURAS, 0)
+    for m in PADRAO_ESTRUTURA.finditer(texto_completo):
+        nome = m.lastgroup
+        inicio, fim = m.span(nome)
+
+        # Ocorrências do mesmo tipo não se sobrepõem (como em uma busca separada por tipo)
+        if inicio < fim_anterior[nome]:
+            continue
+        fim_anterior[nome] = fim
+
+        # Os grupos internos vêm logo depois do grupo nomeado
+        if nome == 'artigo':
+            artigos.append((inicio, fim, m.group(m.lastindex + 1)))
+        else:
+            cabecalhos[nome].append((inicio, m.group(m.lastindex + 1), m.group(m.lastindex + 2).strip()))
+
+    titulos = cabecalhos['titulo']
+    capitulos = cabecalhos['capitulo']
+    secoes = cabecalhos['secao']
+    subsecoes = cabecalhos['subsecao']
 
-    padrao_capitulo = re.compile(
-        r'(?m)^CAP[ÍIi|l1]TULO\s*([IVXLCDM|]+|[0-9]+)\s*[-–—]?\s*(.*?)$',
-        re.IGNORECASE
-    )
+    # Debug: Verificar se está encontrando
+    if debug:
+        print(f'\n{"=" * 50}')
+        print(f'ANÁLISE DO DOCUMENTO: {numero_ica}')
+        print(f'{"=" * 50}')
 
-    padrao_secao = re.compile(
-        r'(?m)^SE[CcGg][ÇçCcGg]?[ÃãAaOo][Oo]?\s*([IVXLCDM|]+|[0-9]+)\s*[-–—]?\s*(.*?)$',
-        re.IGNORECASE
-    )
+        print(f'\n📌 Títulos extraídos ({len(titulos)}):')
+        for pos, num, nome in titulos[:5]:  # Mostra apenas os 5 primeiros
+            print(f'   Posição {pos}: TÍTULO {num} - {nome[:50]}...')
 
-    padrao_subsecao = re.compile(
-        r'(?m)^SUBSE[CcGg][ÇçCcGg]?[ÃãAaOo][Oo]?\s*([IVXLCDM|]+|[0-9]+)\s*[-–—]?\s*(.*?)$',
-        re.IGNORECASE
-    )
+        print(f'\n📌 Capítulos extraídos ({len(capitulos)}):')
+        for pos, num, nome in capitulos:
+            print(f'   Posição {pos}: CAPÍTULO {num} - {nome[:50]}...')
 
-    # Padrão para identificar artigos (mantém o seu)
-    padrao_artigo = re.compile(
-        r'(?m)^(Art\.?\s*\d{1,4}[ººº°]?\.?|Artigo\s+\d{1,4}[ººº°]?\.?)',
-        re.IGNORECASE
-    )
+        print(f'\n📌 Seções extraídas ({len(secoes)}):')
+        for pos, num, nome in secoes[:5]:
+            print(f'   Posição {pos}: SEÇÃO {num} - {nome[:50]}...')
+
+        print(f'\n📌 Subseções extraídas ({len(subsecoes)}):')
+        for pos, num, nome in subsecoes[:5]:
+            print(f'   Posição {pos}: SUBSEÇÃO {num} - {nome[:50]}...')
+
+        print(f'\n📌 Artigos encontrados: {len(artigos)}')
+
+    # Determinar o contexto hierárquico de todos os artigos de uma só vez
+    posicoes_artigos = np.fromiter((inicio for inicio, _, _ in artigos), dtype=np.int64, count=len(artigos))
+    titulos_atuais = localizar_cabecalhos(titulos, posicoes_artigos, "TÍTULO")
+    capitulos_atuais = localizar_cabecalhos(capitulos, posicoes_artigos, "CAPÍTULO")
+    secoes_atuais = localizar_cabecalhos(secoes, posicoes_artigos, "SEÇÃO")
+    subsecoes_atuais = localizar_cabecalhos(subsecoes, posicoes_artigos, "SUBSEÇÃO")
+
+    # Determinar início e fim do texto de cada artigo (até o início do próximo)
+    fins_artigos = [inicio for inicio, _, _ in artigos[1:]] + [len(texto_completo)]
+    intervalos_artigos = [(fim_numero, fim) for (_, fim_numero, _), fim in zip(artigos, fins_artigos)]
 
-    # Debug: Verificar se está encontrando
-    print(f'\n{"=" * 50}')
-    print(f'ANÁLISE DO DOCUMENTO: {numero_ica}')
-    print(f'{"=" * 50}')
-
-    # Encontrar todas as ocorrências
-    titulos = [(m.start(), m.group(1), m.group(2).strip()) for m in padrao_titulo.finditer(texto_completo)]
-    print(f'\n📌 Títulos extraídos ({len(titulos)}):')
-    for pos, num, nome in titulos[:5]:  # Mostra apenas os 5 primeiros
-        print(f'   Posição {pos}: TÍTULO {num} - {nome[:50]}...')
-
-    capitulos = [(m.start(), m.group(1), m.group(2).strip()) for m in padrao_capitulo.finditer(texto_completo)]
-    print(f'\n📌 Capítulos extraídos ({len(capitulos)}):')
-    for pos, num, nome in capitulos:
-        print(f'   Posição {pos}: CAPÍTULO {num} - {nome[:50]}...')
-
-    secoes = [(m.start(), m.group(1), m.group(2).strip()) for m in padrao_secao.finditer(texto_completo)]
-    print(f'\n📌 Seções extraídas ({len(secoes)}):')
-    for pos, num, nome in secoes[:5]:
-        print(f'   Posição {pos}: SEÇÃO {num} - {nome[:50]}...')
-
-    subsecoes = [(m.start(), m.group(1), m.group(2).strip()) for m in padrao_subsecao.finditer(texto_completo)]
-    print(f'\n📌 Subseções extraídas ({len(subsecoes)}):')
-    for pos, num, nome in subsecoes[:5]:
-        print(f'   Posição {pos}: SUBSEÇÃO {num} - {nome[:50]}...')
-
-    # Encontrar todos os artigos
-    matches_artigos = list(padrao_artigo.finditer(texto_completo))
-    print(f'\n📌 Artigos encontrados: {len(matches_artigos)}')
-
-    artigos_estruturados = []
     data_acesso = datetime.now().strftime("%d-%m-%Y")
 
-    for i, match in enumerate(matches_artigos):
+    for i, (_, _, numero_artigo_raw) in enumerate(artigos):
         # Extrair número do artigo
-        numero_artigo_raw = match.group(1).strip()
+        numero_artigo_raw = numero_artigo_raw.strip()
         # Normalizar o número do artigo
-        numero_artigo = re.sub(r'[ºº°]', 'º', numero_artigo_raw)
-        numero_artigo = re.sub(r'\s+', ' ', numero_artigo)
+        numero_artigo = PADRAO_ORDINAL.sub('º', numero_artigo_raw)
+        numero_artigo = PADRAO_ESPACOS.sub(' ', numero_artigo)
         if not numero_artigo.endswith('.'):
             numero_artigo = numero_artigo.rstrip('.')
 
-        # Determinar início e fim do texto do artigo
-        inicio_artigo = match.end()
-        fim_artigo = matches_artigos[i + 1].start() if i + 1 < len(matches_artigos) else len(texto_completo)
-
-        # Extrair texto do artigo
-        texto_artigo = texto_completo[inicio_artigo:fim_artigo].strip()
-
-        # Limpar excesso de espaços e quebras de linha
-        texto_artigo = re.sub(r'\s+', ' ', texto_artigo)
-        texto_artigo = texto_artigo.strip()
+        # Extrair texto do artigo, limpando excesso de espaços e quebras de linha
+        # (split() sem argumentos já descarta os espaços das pontas)
+        inicio_artigo, fim_artigo = intervalos_artigos[i]
+        texto_artigo = ' '.join(texto_completo[inicio_artigo:fim_artigo].split())
 
         # Concatenar número do artigo com o texto
         texto_completo_artigo = f"{numero_artigo} {texto_artigo}"
 
-        # Determinar o contexto hierárquico
-        posicao_artigo = match.start()
-
-        # Encontrar o contexto atual
-        titulo_atual = None
-        capitulo_atual = None
-        secao_atual = None
-        subsecao_atual = None
-
-        # Título
-        for pos, num, nome in reversed(titulos):
-            if pos < posicao_artigo:
-                titulo_atual = f"TÍTULO {num}" + (f" - {nome}" if nome else "")
-                break
-
-        # Capítulo
-        for pos, num, nome in reversed(capitulos):
-            if pos < posicao_artigo:
-                capitulo_atual = f"CAPÍTULO {num}" + (f" - {nome}" if nome else "")
-                break
-
-        # Seção
-        for pos, num, nome in reversed(secoes):
-            if pos < posicao_artigo:
-                secao_atual = f"SEÇÃO {num}" + (f" - {nome}" if nome else "")
-                break
-
-        # Subseção
-        for pos, num, nome in reversed(subsecoes):
-            if pos < posicao_artigo:
-                subsecao_atual = f"SUBSEÇÃO {num}" + (f" - {nome}" if nome else "")
-                break
+        # Contexto atual
+        titulo_atual = titulos_atuais[i]
+        capitulo_atual = capitulos_atuais[i]
+        secao_atual = secoes_atuais[i]
+        subsecao_atual = subsecoes_atuais[i]
 
         # Gerar ID único
         # TODO Não ler os primeiros artigos, eles não servem pra salvar informações
@@ -382,50 +516,129 @@ def extrair_artigos_estruturados(textos: List[str], numero_ica: str, data_public
             }
         }
 
-        artigos_estruturados.append(artigo_estruturado)
+        yield artigo_estruturado
+
+
+def localizar_cabecalhos(
+        cabecalhos: List[Tuple[int, str, str]],
+        posicoes_artigos: np.ndarray,
+        rotulo: str
+) -> List[Optional[str]]:
+    """
+    Encontra, para cada artigo, o último cabeçalho (título, capítulo, etc.) que aparece antes dele.
+
+    Args:
+        cabecalhos: Lista de tuplas (posição, número, nome), em ordem de posição
+        posicoes_artigos: Posições de início dos artigos no texto completo
+        rotulo: Rótulo do cabeçalho (ex: "TÍTULO")
 
-    return artigos_estruturados
+    Returns:
+        Lista com o cabeçalho formatado de cada artigo, ou None se não houver cabeçalho anterior
+    """
+    posicoes_cabecalhos = np.fromiter((c[0] for c in cabecalhos), dtype=np.int64, count=len(cabecalhos))
+    # side='left' conta apenas os cabeçalhos com posição estritamente menor que a do artigo
+    indices = np.searchsorted(posicoes_cabecalhos, posicoes_artigos, side='left') - 1
 
+    nomes = [f"{rotulo} {num}" + (f" - {nome}" if nome else "") for _, num, nome in cabecalhos]
+    return [nomes[idx] if idx >= 0 else None for idx in indices.tolist()]
 
-def salvar_artigos_json(artigos: List[Dict], caminho_saida: str, formato: str = 'compacto'):
+
+def serializar_json(obj, indentado: bool = False) -> bytes:
     """
-    Salva a lista de artigos em um arquivo JSON.
+    Serializa um objeto em JSON (UTF-8, sem escapar acentos).
+
+    Usa o orjson quando disponível (bem mais rápido) e o json da biblioteca padrão caso contrário.
 
     Args:
-        artigos: Lista de dicionários com os artigos estruturados
-        caminho_saida: Caminho completo do arquivo de saída
-        formato: 'compacto', 'legivel' ou 'estruturado'
+        obj: Objeto a serializar
+        indentado: Se True, indenta com 2 espaços; se False, gera o formato compacto
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indentado else 0)
+
+    if indentado:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def escrever_lista_json(f: BinaryIO, itens: Iterable[Dict], indentado: bool = False) -> int:
+    """
+    Escreve uma lista JSON em um arquivo binário, um item por vez, sem montá-la em memória.
+
+    A saída é idêntica à de serializar_json aplicado à lista inteira.
+
+    Args:
+        f: Arquivo aberto em modo binário
+        itens: Itens da lista (pode ser um gerador)
+        indentado: Se True, indenta com 2 espaços; se False, gera o formato compacto
+
+    Returns:
+        Número de itens escritos
+    """
+    # Separadores no mesmo formato do json.dump/orjson (strings JSON nunca têm quebras de linha cruas)
+    abertura, separador, fechamento = (b'[\n  ', b',\n  ', b'\n]') if indentado else (b'[', b',', b']')
+
+    total = 0
+    for item in itens:
+        f.write(separador if total else abertura)
+        dados = serializar_json(item, indentado)
+        f.write(dados.replace(b'\n', b'\n  ') if indentado else dados)
+        total += 1
+
+    f.write(fechamento if total else b'[]')
+    return total
+
+
+def salvar_artigos_json(artigos: Iterable[Dict], caminho_saida: str, formato: str = 'compacto'):
     """
-    # Garantir que o diretório de saída existe
-    diretorio = os.path.dirname(caminho_saida)
-    if diretorio and not os.path.exists(diretorio):
-        os.makedirs(diretorio)
+    Salva os artigos em um arquivo JSON.
+
+    O diretório de saída já deve existir (o ICAJSONGenerator o cria no __init__).
 
-    if formato == 'compacto':
+    Args:
+        artigos: Dicionários com os artigos estruturados (lista ou gerador; exceto no formato
+            'estruturado', são gravados um a um, sem montar a lista inteira em memória)
+        caminho_saida: Caminho completo do arquivo de saída
+        formato: 'compacto', 'legivel', 'estruturado' ou 'ndjson'
+            ('ndjson' acrescenta um artigo por linha ao final do arquivo, permitindo
+            juntar vários documentos em uma única saída)
+    """
+    total_artigos = 0
+    if formato == 'ndjson':
+        # Um artigo por linha, acrescentado ao arquivo existente
+        with open(caminho_saida, 'ab') as f:
+            for artigo in artigos:
+                f.write(serializar_json(artigo) + b'\n')
+                total_artigos += 1
+
+    elif formato == 'compacto':
         # Formato compacto (sem indentação, economiza espaço)
-        with open(caminho_saida, 'w', encoding='utf-8') as f:
-            json.dump(artigos, f, ensure_ascii=False, separators=(',', ':'))
+        with open(caminho_saida, 'wb') as f:
+            total_artigos = escrever_lista_json(f, artigos)
 
     elif formato == 'legivel':
         # Formato legível (com indentação)
-        with open(caminho_saida, 'w', encoding='utf-8') as f:
-            json.dump(artigos, f, ensure_ascii=False, indent=2)
+        with open(caminho_saida, 'wb') as f:
+            total_artigos = escrever_lista_json(f, artigos, indentado=True)
 
     elif formato == 'estruturado':
-        # Formato estruturado com metadados do documento
+        # Formato estruturado com metadados do documento (o total vem antes dos artigos,
+        # então aqui a lista precisa ser montada)
+        artigos = list(artigos)
+        total_artigos = len(artigos)
         documento_completo = {
             "metadados_documento": {
-                "total_artigos": len(artigos),
+                "total_artigos": total_artigos,
                 "data_extracao": datetime.now().strftime("%d-%m-%Y %H:%M:%S"),
                 "nome_arquivo_origem": os.path.basename(caminho_saida).replace('_artigos.json', '.pdf')
             },
             "artigos": artigos
         }
 
-        with open(caminho_saida, 'w', encoding='utf-8') as f:
-            json.dump(documento_completo, f, ensure_ascii=False, indent=2)
+        with open(caminho_saida, 'wb') as f:
+            f.write(serializar_json(documento_completo, indentado=True))
 
-    print(f"✅ {len(artigos)} artigos salvos em: {caminho_saida}")
+    print(f"✅ {total_artigos} artigos salvos em: {caminho_saida}")
 
 
 if __name__ == '__main__':
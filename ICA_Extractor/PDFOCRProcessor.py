@@ -1,13 +1,195 @@
 import os
+import re
 import json
+import hashlib
+import shutil
+import argparse
+import multiprocessing
+import queue
+import threading
+import time
+from contextlib import closing
 import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, NamedTuple
 from datetime import datetime
 import pdfplumber
+import pypdfium2
 from paddleocr import PaddleOCR
-from PIL import Image
-import io
+
+
+# Instância do PaddleOCR de cada processo do pool de OCR (criada uma vez por processo)
+_ocr_worker = None
+
+# Processador de cada processo do pool de PDFs (criado uma vez por processo)
+_processador_worker = None
+
+# Tempo máximo (em segundos) que um lote incompleto de páginas espera por mais páginas antes de ir para o OCR
+TEMPO_MAXIMO_LOTE_OCR = 0.2
+
+# Sequências de espaços/tabulações dentro de uma linha reconhecida pelo OCR
+PADRAO_ESPACOS_LINHA = re.compile(r'[ \t]+')
+
+# Resolução usada quando a resolução padrão perde texto (letras muito pequenas)
+DPI_MAXIMO_OCR = 300
+# Fração mínima do texto lido na resolução máxima para manter a resolução padrão
+PROPORCAO_MINIMA_TEXTO_DPI = 0.95
+
+# Quantas vezes um PDF pode estar em processamento quando um processo do pool morre antes de ser dado como falho
+MAXIMO_QUEDAS_POOL_PDF = 2
+
+# Intervalo (em segundos) em que a thread de renderização, esperando a fila, verifica se deve parar
+INTERVALO_VERIFICACAO_PARADA = 0.1
+# Intervalo máximo (em segundos) entre as escritas das páginas prontas no .txt
+INTERVALO_ESCRITA_TXT = 1.0
+
+
+class CalibracaoDPI(NamedTuple):
+    """Primeira página escaneada de um PDF, renderizada em duas resoluções para escolher o DPI do OCR."""
+    pagina: int
+    imagens: Dict[int, np.ndarray]  # DPI -> imagem
+    resposta: queue.Queue  # Recebe o DPI escolhido
+
+
+def criar_paddleocr(cpu_threads: int = None, enable_hpi: bool = False, use_gpu: bool = False) -> PaddleOCR:
+    """
+    Cria uma instância do PaddleOCR com a configuração usada nos ICAs, já aquecida.
+
+    Args:
+        cpu_threads: Threads de CPU usadas na inferência (padrão: número de CPUs)
+        enable_hpi: Se True, usa a inferência de alto desempenho do PaddleOCR, que escolhe
+            automaticamente o backend mais rápido (OpenVINO/ONNX Runtime na CPU, TensorRT na GPU).
+            Requer as dependências extras (`paddleocr install_hpi_deps cpu` ou `gpu`)
+        use_gpu: Se True, roda na primeira GPU CUDA com TensorRT em FP16
+    """
+    if use_gpu:
+        config_dispositivo = dict(
+            device='gpu:0',
+            use_tensorrt=True,  # Motores TensorRT (o primeiro uso é lento: os motores são construídos)
+            precision='fp16',
+            # Na GPU, os lotes são processados em paralelo
+            rec_batch_num=16,
+            cls_batch_num=16
+        )
+    else:
+        config_dispositivo = dict(
+            device='cpu',
+            # Na CPU, lotes maiores não são paralelizados dentro do predictor e só aumentam a memória reservada
+            rec_batch_num=1,
+            cls_batch_num=1,
+            cpu_threads=cpu_threads or os.cpu_count() or 1,
+            enable_mkldnn=True  # Kernels otimizados (oneDNN) para CPU
+        )
+
+    ocr = PaddleOCR(
+        enable_hpi=enable_hpi,
+        use_angle_cls=True,  # Detecta e corrige rotação de texto
+        lang='pt',  # Português
+        # show_log=False,  # Não mostra logs verbosos
+        det_db_thresh=0.3,  # Threshold de detecção (0.3 é bom para docs limpos)
+        det_db_box_thresh=0.5,  # Threshold de confiança da caixa
+        **config_dispositivo
+    )
+    # Aquecimento: a primeira chamada ao predict é bem mais lenta que as seguintes. A imagem tem o
+    # tamanho em que a detecção trabalha; na GPU, a segunda chamada já usa os kernels escolhidos na primeira
+    imagem_aquecimento = np.zeros((960, 960, 3), dtype=np.uint8)
+    try:
+        for _ in range(2 if use_gpu else 1):
+            ocr.predict(imagem_aquecimento)
+    except Exception as e:
+        # Sem aquecimento, só a primeira página fica mais lenta
+        print(f"⚠️  Falha no aquecimento do PaddleOCR: {e}")
+    return ocr
+
+
+def juntar_textos_ocr(resultado) -> str:
+    """Junta as linhas reconhecidas pelo PaddleOCR em um único texto, com os espaços normalizados."""
+    if not resultado:
+        return ""
+    texto = "\n".join(linha for pag in resultado for linha in pag['rec_texts'])
+    return PADRAO_ESPACOS_LINHA.sub(' ', texto)
+
+
+def imagem_para_ocr(img_array: np.ndarray) -> np.ndarray:
+    """Replica o canal de imagens em tons de cinza: o PaddleOCR espera imagens com 3 canais."""
+    if img_array.ndim == 2:
+        return np.repeat(img_array[:, :, np.newaxis], 3, axis=2)
+    return img_array
+
+
+def hash_arquivo(caminho: Path) -> str:
+    """Hash MD5 do conteúdo de um arquivo, lido em blocos (sem carregar o arquivo inteiro)."""
+    h = hashlib.md5()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def concorrencia_ocr_ambiente() -> Optional[int]:
+    """Número de processos de OCR da variável de ambiente OCR_CONCURRENCY (None se não definida, 0 ou inválida)."""
+    valor = os.environ.get("OCR_CONCURRENCY", "").strip()
+    if not valor:
+        return None
+    try:
+        workers = int(valor)
+    except ValueError:
+        workers = -1
+    if workers < 0:
+        print(f"⚠️  OCR_CONCURRENCY={valor!r} inválido (esperado um inteiro positivo); usando o padrão")
+        return None
+    # 0 também significa o padrão
+    return workers or None
+
+
+def _iniciar_ocr_worker(cpu_threads: int, enable_hpi: bool, use_gpu: bool):
+    """Initializer do pool: carrega o PaddleOCR uma única vez em cada processo."""
+    global _ocr_worker
+    _ocr_worker = criar_paddleocr(cpu_threads, enable_hpi, use_gpu)
+
+
+def ocr_lote(ocr: PaddleOCR, imgs: List[np.ndarray]) -> List[str]:
+    """Executa o OCR de um lote de páginas com uma única chamada ao predict."""
+    resultados = ocr.predict([imagem_para_ocr(img) for img in imgs])
+    # O predict retorna um resultado por imagem, na mesma ordem
+    return [juntar_textos_ocr([resultado]) for resultado in resultados]
+
+
+def _ocr_lote_worker(imgs: List[np.ndarray]) -> List[str]:
+    """Executa o OCR de um lote de páginas dentro de um processo do pool."""
+    return ocr_lote(_ocr_worker, imgs)
+
+
+def _iniciar_pdf_worker(
+        input_dir: str,
+        output_dir: str,
+        ocr_dpi: int,
+        ajustar_dpi: bool,
+        ocr_batch_size: int,
+        cpu_threads: int,
+        enable_hpi: bool,
+        use_gpu: bool
+):
+    """Initializer do pool de PDFs: cada processo tem seu próprio processador (e seu próprio PaddleOCR)."""
+    global _processador_worker
+    # O paralelismo já está entre os PDFs, então o OCR de cada processo é sequencial.
+    # O log é lido e gravado só pelo processo principal
+    _processador_worker = PDFOCRProcessor(
+        input_dir, output_dir, ocr_workers=1, ocr_dpi=ocr_dpi, ajustar_dpi=ajustar_dpi, ocr_batch_size=ocr_batch_size,
+        cpu_threads=cpu_threads, enable_hpi=enable_hpi, use_gpu=use_gpu, usar_log=False
+    )
+
+
+def _processar_pdf_worker(pdf_path: Path, force_ocr: bool) -> Optional[str]:
+    """Processa um PDF dentro de um processo do pool. Retorna a mensagem de erro, ou None se deu certo."""
+    try:
+        _processador_worker.save_pdf_text(pdf_path, force_ocr)
+    except Exception as e:
+        return str(e)
+    return None
 
 
 class PDFOCRProcessor:
@@ -16,14 +198,40 @@ class PDFOCRProcessor:
     Extrai texto e salva em formato .txt para uso posterior.
     """
 
-    def __init__(self, input_dir: str, output_dir: str = None, use_gpu: bool = False):
+    def __init__(
+            self,
+            input_dir: str,
+            output_dir: str = None,
+            use_gpu: bool = False,
+            ocr_workers: int = None,
+            ocr_dpi: int = 200,
+            ajustar_dpi: bool = True,
+            ocr_batch_size: int = 8,
+            cpu_threads: int = None,
+            enable_hpi: bool = None,
+            usar_log: bool = True
+    ):
         """
         Inicializa o processador de PDFs.
 
         Args:
             input_dir: Diretório com os PDFs originais
             output_dir: Diretório para salvar os .txt (padrão: input_dir/ocr_output)
-            use_gpu: Se True, usa GPU (mais rápido). Se False, usa CPU
+            use_gpu: Se True, faz o OCR na GPU (CUDA + TensorRT FP16). Se False, usa CPU
+            ocr_workers: Número de processos para o OCR das páginas (padrão: variável de ambiente
+                OCR_CONCURRENCY ou, se não definida, o número de CPUs; 1 com GPU).
+                Com 1, o OCR é feito sequencialmente no processo principal
+            ocr_dpi: Resolução usada para converter as páginas em imagem antes do OCR
+                (200 é suficiente para documentos limpos e bem mais rápido que 300)
+            ajustar_dpi: Se True, a primeira página escaneada de cada PDF é lida também a 300 DPI;
+                se ocr_dpi perder mais de 5% do texto, o PDF inteiro é lido a 300 DPI
+            ocr_batch_size: Número máximo de páginas enviadas juntas em cada chamada ao PaddleOCR
+            cpu_threads: Threads de CPU de cada instância do PaddleOCR (padrão: as CPUs divididas
+                entre os processos de OCR, para não disputarem os mesmos núcleos)
+            enable_hpi: Se True, usa a inferência de alto desempenho do PaddleOCR (padrão: variável
+                de ambiente OCR_ENABLE_HPI=1). Requer as dependências extras do PaddleOCR
+            usar_log: Se False, o log de processamento não é lido nem gravado (processos do pool
+                de PDFs, que só extraem os textos)
         """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir) if output_dir else self.input_dir / "ocr_output"
@@ -31,34 +239,128 @@ class PDFOCRProcessor:
         # Cria diretório de saída se não existir
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Inicializa PaddleOCR
-        print("🔧 Inicializando PaddleOCR...")
-        self.ocr = PaddleOCR(
-            use_angle_cls=True,  # Detecta e corrige rotação de texto
-            lang='pt',  # Português
-            # use_gpu=use_gpu,  # GPU ou CPU
-            # show_log=False,  # Não mostra logs verbosos
-            det_db_thresh=0.3,  # Threshold de detecção (0.3 é bom para docs limpos)
-            det_db_box_thresh=0.5  # Threshold de confiança da caixa
+        # O PaddleOCR (do processo principal ou do pool) só é carregado quando alguma página precisa de OCR
+        # Com GPU, um único processo já ocupa a placa (cada processo a mais carrega outra cópia dos modelos)
+        self.use_gpu = use_gpu
+        self.ocr_workers = (
+            ocr_workers or concorrencia_ocr_ambiente() or (1 if use_gpu else os.cpu_count() or 1)
         )
-        print("✅ PaddleOCR inicializado!")
+        self._ocr = None
+        self._ocr_pool = None
+        self.ocr_dpi = ocr_dpi
+        self.ajustar_dpi = ajustar_dpi
+        self.ocr_batch_size = ocr_batch_size
+        self.cpu_threads = cpu_threads or max((os.cpu_count() or 1) // self.ocr_workers, 1)
+        self.enable_hpi = enable_hpi if enable_hpi is not None else os.environ.get("OCR_ENABLE_HPI") == "1"
 
-        # Log de processamento
-        self.log_file = self.output_dir / "processing_log.json"
-        self.processing_log = self._load_log()
+        # Log de processamento: um evento por linha (JSONL), só acrescentado a cada PDF
+        self.log_file = self.output_dir / "processing_log.jsonl"
+        self.usar_log = usar_log
+        self.processing_log = (
+            self._load_log() if usar_log else {"processed_files": {}, "failed_files": [], "last_run": None}
+        )
+        # Índice inverso do log, para achar PDFs de mesmo conteúdo com outro nome
+        self._stem_por_hash = {
+            hash_pdf: pdf_name for pdf_name, hash_pdf in self.processing_log["processed_files"].items() if hash_pdf
+        }
+
+    @property
+    def ocr(self) -> PaddleOCR:
+        """Instância do PaddleOCR do processo principal (inicializada no primeiro uso)."""
+        if self._ocr is None:
+            print("🔧 Inicializando PaddleOCR...")
+            self._ocr = criar_paddleocr(self.cpu_threads, self.enable_hpi, self.use_gpu)
+            print("✅ PaddleOCR inicializado!")
+        return self._ocr
+
+    def _get_ocr_pool(self) -> ProcessPoolExecutor:
+        """Pool de processos para o OCR das páginas (criado no primeiro uso e reaproveitado)."""
+        if self._ocr_pool is None:
+            print(f"🔧 Inicializando pool de OCR com {self.ocr_workers} processos...")
+            # "spawn" em vez de fork: o pool é criado com a thread de renderização já rodando,
+            # e o PaddlePaddle não funciona bem em processos criados por fork
+            self._ocr_pool = ProcessPoolExecutor(
+                max_workers=self.ocr_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_iniciar_ocr_worker,
+                initargs=(self.cpu_threads, self.enable_hpi, self.use_gpu)
+            )
+        return self._ocr_pool
+
+    def close(self):
+        """Encerra o pool de processos de OCR, se existir."""
+        if self._ocr_pool is not None:
+            self._ocr_pool.shutdown()
+            self._ocr_pool = None
 
     def _load_log(self) -> Dict:
-        """Carrega log de processamento anterior (para continuar de onde parou)."""
-        if self.log_file.exists():
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {"processed_files": [], "failed_files": [], "last_run": None}
-
-    def _save_log(self):
-        """Salva log de processamento."""
-        self.processing_log["last_run"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        """
+        Carrega log de processamento anterior (para continuar de onde parou), reconstruindo-o
+        a partir dos eventos do JSONL.
+
+        Processados: nome do PDF -> hash do conteúdo (um dict, para a verificação ser O(1)).
+        """
+        log = {"processed_files": {}, "failed_files": [], "last_run": None}
+
+        if not self.log_file.exists():
+            self._migrar_log_antigo(log)
+            return log
+
+        with open(self.log_file, 'rb+') as f:
+            dados = f.read()
+            # Execução interrompida no meio da escrita: descarta a última linha incompleta,
+            # senão o próximo evento seria colado nela
+            if not dados.endswith(b"\n"):
+                dados = dados[:dados.rfind(b"\n") + 1]
+                f.truncate(len(dados))
+
+        for linha in dados.decode('utf-8').splitlines():
+            evento = json.loads(linha)
+            if evento["status"] == "ok":
+                log["processed_files"][evento["file"]] = evento.get("hash")
+            else:
+                log["failed_files"].append({
+                    "file": evento["file"],
+                    "error": evento.get("error"),
+                    "timestamp": evento["ts"]
+                })
+            log["last_run"] = evento["ts"]
+        return log
+
+    def _migrar_log_antigo(self, log: Dict):
+        """Converte o processing_log.json das versões anteriores (reescrito a cada PDF) para o JSONL."""
+        log_antigo = self.log_file.with_suffix(".json")
+        if not log_antigo.exists():
+            return
+
+        with open(log_antigo, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        # Logs mais antigos guardavam só a lista de nomes; esses ficam sem hash (None)
+        processados = dados.get("processed_files", [])
+        if isinstance(processados, list):
+            processados = dict.fromkeys(processados)
+
+        ts = dados.get("last_run") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        eventos = [{"file": nome, "status": "ok", "hash": hash_pdf, "ts": ts} for nome, hash_pdf in processados.items()]
+        eventos += [
+            {"file": falha["file"], "status": "fail", "error": falha.get("error"), "ts": falha.get("timestamp", ts)}
+            for falha in dados.get("failed_files", [])
+        ]
         with open(self.log_file, 'w', encoding='utf-8') as f:
-            json.dump(self.processing_log, f, indent=2, ensure_ascii=False)
+            f.writelines(json.dumps(evento, ensure_ascii=False) + "\n" for evento in eventos)
+
+        log["processed_files"] = processados
+        log["failed_files"] = [
+            {"file": e["file"], "error": e["error"], "timestamp": e["ts"]} for e in eventos if e["status"] == "fail"
+        ]
+        log["last_run"] = dados.get("last_run")
+
+    def _save_log(self, evento: Dict):
+        """Acrescenta um evento ao log de processamento (sem reescrever o arquivo)."""
+        if not self.usar_log:
+            return
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(evento, ensure_ascii=False) + "\n")
 
     def get_pdf_files(self) -> List[Path]:
         """Retorna lista de todos os arquivos PDF no diretório de entrada."""
@@ -66,68 +368,196 @@ class PDFOCRProcessor:
         print(f"📁 {len(pdf_files)} arquivos PDF encontrados em {self.input_dir}")
         return pdf_files
 
-    def extract_text_from_page(self, page_image: Image.Image) -> str:
+    def process_single_pdf(self, pdf_path: Path, force_ocr: bool = False) -> bool:
         """
-        Extrai texto de uma página usando PaddleOCR.
+        Processa um único PDF.
 
         Args:
-            page_image: Imagem PIL da página
+            pdf_path: Caminho do arquivo PDF
+            force_ocr: Se True, força OCR mesmo se texto nativo existir
 
         Returns:
-            Texto extraído da página
+            True se processado com sucesso, False caso contrário
         """
-        # Converte imagem PIL para bytes
-        img_bytes = io.BytesIO()
-        page_image.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
+        pdf_name = pdf_path.stem
 
+        try:
+            hash_pdf = hash_arquivo(pdf_path)
 
+            # Verifica se já foi processado
+            if self._ja_processado(pdf_path, hash_pdf):
+                print(f"⏭️  {pdf_name}.pdf já processado anteriormente. Pulando...")
+                return True
+            nome_anterior = self._processado_com_outro_nome(pdf_path, hash_pdf)
+            if nome_anterior:
+                self._reaproveitar_texto(pdf_path, hash_pdf, nome_anterior)
+                return True
 
-        # Executa OCR
-        # resultado = self.ocr.ocr(img_bytes.getvalue(), cls=True)
-        # resultado = self.ocr.predict(img_bytes.getvalue())
+            print(f"\n{'=' * 60}")
+            print(f"📄 Processando: {pdf_name}.pdf")
+            print(f"{'=' * 60}")
 
-        img_array = np.array(page_image)
-        resultado = self.ocr.predict(img_array)
-        # print(f'Tipo de resultado: {type(resultado)}')
-        # print(f'Resultado OCR: {resultado[0]}')
+            total_caracteres = self.save_pdf_text(pdf_path, force_ocr)
+            self._registrar_sucesso(pdf_name, hash_pdf)
 
-        # Verifica se há resultado
-        texto_linhas = []
-        if resultado and len(resultado) > 0:
-            print('Tem resultado')
-            for pag in resultado:
-                texto_linhas.append("\n".join(pag['rec_texts']))
+            print(f"✅ Texto salvo em: {pdf_name}.txt")
+            print(f"📊 Total de caracteres extraídos: {total_caracteres}")
 
-        return "\n".join(texto_linhas)
+            return True
 
-    def process_single_pdf(self, pdf_path: Path, force_ocr: bool = False) -> bool:
+        except Exception as e:
+            print(f"❌ ERRO ao processar {pdf_name}.pdf: {str(e)}")
+            self._registrar_falha(pdf_name, str(e))
+            return False
+
+    def save_pdf_text(self, pdf_path: Path, force_ocr: bool = False) -> int:
         """
-        Processa um único PDF.
+        Extrai o texto de um PDF (nativo ou via OCR) e salva no .txt de saída.
+
+        Não consulta nem atualiza o log de processamento.
 
         Args:
             pdf_path: Caminho do arquivo PDF
             force_ocr: Se True, força OCR mesmo se texto nativo existir
 
         Returns:
-            True se processado com sucesso, False caso contrário
+            Total de caracteres salvos
         """
-        pdf_name = pdf_path.stem
-        output_txt = self.output_dir / f"{pdf_name}.txt"
+        output_txt = self.output_dir / f"{pdf_path.stem}.txt"
+        # Texto de cada página (None nas páginas que aguardam OCR), preenchido pela thread de renderização
+        textos_paginas = []
+        # Lotes já enviados para OCR: (números das páginas, textos ou future do pool)
+        lotes_ocr = []
 
-        # Verifica se já foi processado
-        if pdf_name in self.processing_log["processed_files"] and output_txt.exists():
-            print(f"⏭️  {pdf_name}.pdf já processado anteriormente. Pulando...")
-            return True
+        # O .txt é escrito em ordem, página a página, assim que a página e todas as anteriores ficam prontas
+        # (mesmo conteúdo de "\n".join(textos_paginas)): o documento inteiro nunca fica em memória, e se o
+        # processamento falhar no meio o .txt já tem as páginas iniciais
+        total_caracteres = 0
+        proxima_pagina = 0
 
-        print(f"\n{'=' * 60}")
-        print(f"📄 Processando: {pdf_name}.pdf")
-        print(f"{'=' * 60}")
+        def escrever_paginas_prontas(f):
+            nonlocal total_caracteres, proxima_pagina
+            for lote_ocr in [l for l in lotes_ocr if isinstance(l[1], list) or l[1].done()]:
+                paginas, textos_ocr = lote_ocr
+                if not isinstance(textos_ocr, list):
+                    textos_ocr = textos_ocr.result()
+                for i, texto_ocr in zip(paginas, textos_ocr):
+                    textos_paginas[i - 1] = f"--- PÁGINA {i} ---\n{texto_ocr}\n"
+                lotes_ocr.remove(lote_ocr)
+
+            inicio = proxima_pagina
+            while proxima_pagina < len(textos_paginas) and textos_paginas[proxima_pagina] is not None:
+                texto_pagina = textos_paginas[proxima_pagina]
+                if proxima_pagina:
+                    f.write("\n")
+                    total_caracteres += 1
+                f.write(texto_pagina)
+                total_caracteres += len(texto_pagina)
+                # Página já escrita: libera o texto (a string vazia não se confunde com None, que é "aguardando OCR")
+                textos_paginas[proxima_pagina] = ""
+                proxima_pagina += 1
+            if proxima_pagina > inicio:
+                # Sem fsync (só no final), mas o que foi escrito não fica preso no buffer se o processo morrer
+                f.flush()
+
+        # Pipeline: uma thread lê/renderiza as páginas enquanto esta faz o OCR das já renderizadas.
+        # A fila limitada impede que a renderização acumule imagens demais na memória
+        fila_ocr = queue.Queue(maxsize=self.ocr_batch_size)
+        # Sinaliza à thread de renderização que pare (erro no OCR): sem isso ela ficaria presa
+        # para sempre no put da fila cheia, com o PDF aberto
+        parar = threading.Event()
+        renderizacao = threading.Thread(
+            target=self._renderizar_paginas,
+            args=(pdf_path, force_ocr, textos_paginas, fila_ocr, parar),
+            daemon=True
+        )
+        renderizacao.start()
 
         try:
-            textos_paginas = []
+            with open(output_txt, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                lote = []
+                prazo_lote = None
+                while True:
+                    escrever_paginas_prontas(f)
+                    try:
+                        # Um lote incompleto é enviado se a próxima página demorar demais para ficar pronta;
+                        # sem lote, a espera é limitada só para as páginas de texto nativo irem sendo escritas
+                        timeout = max(prazo_lote - time.monotonic(), 0) if lote else INTERVALO_ESCRITA_TXT
+                        item = fila_ocr.get(timeout=timeout)
+                    except queue.Empty:
+                        if lote:
+                            lotes_ocr.append(self._enviar_lote_ocr(lote))
+                            self._limitar_lotes_pendentes(lotes_ocr)
+                            lote = []
+                        continue
+
+                    if item is None:
+                        break
+                    # Erro na leitura do PDF é repassado pela fila
+                    if isinstance(item, Exception):
+                        raise item
+                    # Primeira página escaneada: o OCR dela define o DPI do restante do PDF
+                    if isinstance(item, CalibracaoDPI):
+                        dpi, texto_ocr = self._calibrar_dpi(item.imagens)
+                        item.resposta.put(dpi)
+                        lotes_ocr.append(([item.pagina], [texto_ocr]))
+                        continue
+
+                    if not lote:
+                        prazo_lote = time.monotonic() + TEMPO_MAXIMO_LOTE_OCR
+                    lote.append(item)
+                    if len(lote) >= self.ocr_batch_size:
+                        lotes_ocr.append(self._enviar_lote_ocr(lote))
+                        self._limitar_lotes_pendentes(lotes_ocr)
+                        lote = []
+
+                if lote:
+                    lotes_ocr.append(self._enviar_lote_ocr(lote))
+
+                # Espera o OCR das páginas escaneadas que faltam, escrevendo cada lote que termina
+                if lotes_ocr:
+                    print(f"  🔎 Aguardando OCR de {sum(len(paginas) for paginas, _ in lotes_ocr)} página(s)...", end=" ")
+                    while lotes_ocr:
+                        pendentes = [textos for _, textos in lotes_ocr if not isinstance(textos, list)]
+                        if pendentes:
+                            wait(pendentes, return_when=FIRST_COMPLETED)
+                        escrever_paginas_prontas(f)
+                    print("✅")
+                escrever_paginas_prontas(f)
+
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            # Em caso de erro, a thread de renderização desiste no próximo put/get e fecha o PDF;
+            # esvaziar a fila libera as imagens que ficaram nela
+            parar.set()
+            renderizacao.join()
+            while not fila_ocr.empty():
+                fila_ocr.get_nowait()
+
+        return total_caracteres
+
+    def _renderizar_paginas(
+            self,
+            pdf_path: Path,
+            force_ocr: bool,
+            textos_paginas: List[Optional[str]],
+            fila_ocr: queue.Queue,
+            parar: threading.Event
+    ):
+        """
+        Lê as páginas do PDF: guarda o texto nativo em textos_paginas e coloca as páginas que
+        precisam de OCR na fila como (número da página, imagem).
 
-            with pdfplumber.open(pdf_path) as pdf:
+        Em caso de erro, coloca a exceção na fila. Ao final, coloca None na fila.
+        Para (fechando o PDF) assim que parar for sinalizado.
+        """
+        dpi = self.ocr_dpi
+        calibrar = self.ajustar_dpi and dpi < DPI_MAXIMO_OCR
+        try:
+            # As páginas escaneadas são renderizadas direto pelo pdfium (que o pdfplumber usa por baixo):
+            # o to_image do pdfplumber reabre o PDF a cada página e sempre gera RGB
+            with pdfplumber.open(pdf_path) as pdf, closing(pypdfium2.PdfDocument(pdf_path)) as doc_pdfium:
                 total_pages = len(pdf.pages)
                 print(f"📖 Total de páginas: {total_pages}")
 
@@ -141,51 +571,185 @@ class PDFOCRProcessor:
                         # Texto nativo encontrado e válido
                         textos_paginas.append(f"--- PÁGINA {i} ---\n{texto_nativo}\n")
                         print("✅ (texto nativo)")
+                    elif not pagina.objects:
+                        # Nenhum caractere, imagem ou desenho: a página está em branco, nem precisa renderizar
+                        textos_paginas.append(f"--- PÁGINA {i} ---\n\n")
+                        print("⬜ (página em branco)")
                     else:
                         # Precisa de OCR
-                        print("🔎 (OCR necessário)...", end=" ")
+                        print("🔎 (OCR necessário)")
 
-                        # Converte página para imagem de alta resolução
-                        img = pagina.to_image(resolution=300).original
+                        # Converte página para imagem em tons de cinza; o OCR é feito na outra ponta da fila.
+                        # Um canal só ocupa 1/3 da memória e do envio para o pool de OCR
+                        textos_paginas.append(None)
+                        if calibrar:
+                            # Espera o OCR das duas versões para saber em qual DPI renderizar as demais
+                            calibrar = False
+                            resposta = queue.Queue(maxsize=1)
+                            imagens = {d: self._renderizar_pagina(doc_pdfium[i - 1], d) for d in (dpi, DPI_MAXIMO_OCR)}
+                            if not self._colocar_na_fila(fila_ocr, CalibracaoDPI(i, imagens, resposta), parar):
+                                return
+                            while not parar.is_set():
+                                try:
+                                    dpi = resposta.get(timeout=INTERVALO_VERIFICACAO_PARADA)
+                                    break
+                                except queue.Empty:
+                                    pass
+                            else:
+                                return
+                        elif not self._colocar_na_fila(fila_ocr, (i, self._renderizar_pagina(doc_pdfium[i - 1], dpi)), parar):
+                            return
+        except Exception as e:
+            if not self._colocar_na_fila(fila_ocr, e, parar):
+                return
+        self._colocar_na_fila(fila_ocr, None, parar)
 
-                        # Extrai texto com OCR
-                        texto_ocr = self.extract_text_from_page(img)
+    @staticmethod
+    def _colocar_na_fila(fila: queue.Queue, item, parar: threading.Event) -> bool:
+        """
+        Coloca item na fila, esperando vaga enquanto parar não for sinalizado.
 
-                        textos_paginas.append(f"--- PÁGINA {i} ---\n{texto_ocr}\n")
-                        print("✅")
+        Returns:
+            False se desistiu porque parar foi sinalizado
+        """
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=INTERVALO_VERIFICACAO_PARADA)
+                return True
+            except queue.Full:
+                pass
+        return False
 
-            # Salva texto completo em arquivo .txt
-            texto_completo = "\n".join(textos_paginas)
+    def _calibrar_dpi(self, imagens: Dict[int, np.ndarray]) -> Tuple[int, str]:
+        """
+        Escolhe o DPI do OCR comparando o texto lido na mesma página em resoluções diferentes.
 
-            with open(output_txt, 'w', encoding='utf-8') as f:
-                f.write(texto_completo)
+        Fica com a menor resolução se ela ler ao menos PROPORCAO_MINIMA_TEXTO_DPI do texto da maior.
 
-            # Atualiza log
-            self.processing_log["processed_files"].append(pdf_name)
-            self._save_log()
+        Args:
+            imagens: Imagens da mesma página, por DPI
 
-            print(f"✅ Texto salvo em: {output_txt.name}")
-            print(f"📊 Total de caracteres extraídos: {len(texto_completo)}")
+        Returns:
+            Tupla (DPI escolhido, texto da página nesse DPI)
+        """
+        dpis = sorted(imagens)
+        _, textos = self._enviar_lote_ocr([(d, imagens[d]) for d in dpis])
+        if not isinstance(textos, list):
+            textos = textos.result()
 
-            return True
+        tamanhos = [len(''.join(texto.split())) for texto in textos]
+        escolhido = 0 if tamanhos[0] >= PROPORCAO_MINIMA_TEXTO_DPI * tamanhos[-1] else len(dpis) - 1
+        print(f"\n  📐 DPI do OCR para este PDF: {dpis[escolhido]}", end=" ")
+        return dpis[escolhido], textos[escolhido]
 
-        except Exception as e:
-            print(f"❌ ERRO ao processar {pdf_name}.pdf: {str(e)}")
-            self.processing_log["failed_files"].append({
-                "file": pdf_name,
-                "error": str(e),
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-            self._save_log()
-            return False
+    def _renderizar_pagina(self, pagina: pypdfium2.PdfPage, dpi: int) -> np.ndarray:
+        """Renderiza uma página em tons de cinza (mesmas opções de renderização do to_image do pdfplumber)."""
+        bitmap = pagina.render(
+            scale=dpi / 72,
+            grayscale=True,
+            no_smoothtext=True,
+            no_smoothpath=True,
+            no_smoothimage=True
+        )
+        # Cópia: o array do to_numpy aponta para a memória do bitmap, liberada junto com ele
+        return np.array(bitmap.to_numpy())
 
-    def process_all_pdfs(self, force_ocr: bool = False, max_files: int = None):
+    def _enviar_lote_ocr(self, lote: List[Tuple[int, np.ndarray]]):
+        """
+        Envia um lote de páginas para o OCR.
+
+        Com um processo de OCR, o lote é processado na hora; com mais, vai para o pool e o
+        resultado é um future (assim a renderização e o OCR de vários lotes acontecem juntos).
+
+        Returns:
+            Tupla (números das páginas, textos extraídos ou future com os textos)
+        """
+        paginas = [i for i, _ in lote]
+        imgs = [img for _, img in lote]
+        if self.ocr_workers <= 1:
+            return paginas, ocr_lote(self.ocr, imgs)
+        return paginas, self._get_ocr_pool().submit(_ocr_lote_worker, imgs)
+
+    def _limitar_lotes_pendentes(self, lotes_ocr: List[Tuple[List[int], object]]):
+        """
+        Espera o OCR terminar algum lote enquanto houver mais de dois lotes por processo do pool na fila.
+
+        O pool guarda as imagens de cada lote até ele ser processado; como a renderização é bem mais
+        rápida que o OCR, sem esse limite as imagens de um PDF grande inteiro ficariam na memória.
+        Enquanto esta espera, a fila limitada também segura a thread de renderização.
+        """
+        pendentes = [textos for _, textos in lotes_ocr if not isinstance(textos, list) and not textos.done()]
+        if len(pendentes) > 2 * self.ocr_workers:
+            wait(pendentes, return_when=FIRST_COMPLETED)
+
+    def _ja_processado(self, pdf_path: Path, hash_pdf: str) -> bool:
+        """
+        Indica se este PDF já foi processado em uma execução anterior (e o .txt ainda existe).
+
+        Um PDF alterado sem mudar de nome é processado de novo.
+
+        Args:
+            pdf_path: Caminho do arquivo PDF
+            hash_pdf: Hash do conteúdo do PDF (ver hash_arquivo)
+        """
+        pdf_name = pdf_path.stem
+        processados = self.processing_log["processed_files"]
+
+        # Registros de logs antigos (sem hash) valem só pelo nome
+        return (
+            pdf_name in processados
+            and processados[pdf_name] in (None, hash_pdf)
+            and (self.output_dir / f"{pdf_name}.txt").exists()
+        )
+
+    def _processado_com_outro_nome(self, pdf_path: Path, hash_pdf: str) -> Optional[str]:
+        """
+        Procura um PDF de mesmo conteúdo já processado com outro nome (e cujo .txt ainda existe).
+
+        Returns:
+            Nome (sem extensão) desse PDF, ou None se não houver
+        """
+        nome_anterior = self._stem_por_hash.get(hash_pdf)
+        if nome_anterior and nome_anterior != pdf_path.stem and (self.output_dir / f"{nome_anterior}.txt").exists():
+            return nome_anterior
+        return None
+
+    def _reaproveitar_texto(self, pdf_path: Path, hash_pdf: str, nome_anterior: str):
+        """Copia o texto de um PDF de mesmo conteúdo para o .txt deste PDF (sem refazer o OCR) e registra no log."""
+        pdf_name = pdf_path.stem
+        shutil.copyfile(self.output_dir / f"{nome_anterior}.txt", self.output_dir / f"{pdf_name}.txt")
+        self._registrar_sucesso(pdf_name, hash_pdf)
+        print(f"♻️  {pdf_name}.pdf tem o mesmo conteúdo de {nome_anterior}.pdf: texto reaproveitado")
+
+    def _registrar_sucesso(self, pdf_name: str, hash_pdf: str):
+        """Registra um PDF processado com sucesso no log."""
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.processing_log["processed_files"][pdf_name] = hash_pdf
+        self.processing_log["last_run"] = ts
+        self._stem_por_hash[hash_pdf] = pdf_name
+        self._save_log({"file": pdf_name, "status": "ok", "hash": hash_pdf, "ts": ts})
+
+    def _registrar_falha(self, pdf_name: str, erro: str):
+        """Registra um PDF que falhou no log."""
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.processing_log["failed_files"].append({
+            "file": pdf_name,
+            "error": erro,
+            "timestamp": ts
+        })
+        self.processing_log["last_run"] = ts
+        self._save_log({"file": pdf_name, "status": "fail", "error": erro, "ts": ts})
+
+    def process_all_pdfs(self, force_ocr: bool = False, max_files: int = None, workers: int = 1):
         """
         Processa todos os PDFs do diretório de entrada.
 
         Args:
             force_ocr: Se True, força OCR mesmo se texto nativo existir
             max_files: Limite de arquivos a processar (útil para testes)
+            workers: Número de PDFs processados em paralelo, cada um em um processo com seu
+                próprio PaddleOCR. Com 1, os PDFs são processados um a um (com o OCR das páginas
+                em paralelo, conforme ocr_workers)
         """
         pdf_files = self.get_pdf_files()
 
@@ -205,13 +769,18 @@ class PDFOCRProcessor:
         sucessos = 0
         falhas = 0
 
-        for idx, pdf_file in enumerate(pdf_files, start=1):
-            print(f"\n[{idx}/{len(pdf_files)}]", end=" ")
+        if workers > 1 and len(pdf_files) > 1:
+            sucessos, falhas = self._process_pdfs_parallel(pdf_files, force_ocr, workers)
+        else:
+            for idx, pdf_file in enumerate(pdf_files, start=1):
+                print(f"\n[{idx}/{len(pdf_files)}]", end=" ")
 
-            if self.process_single_pdf(pdf_file, force_ocr):
-                sucessos += 1
-            else:
-                falhas += 1
+                if self.process_single_pdf(pdf_file, force_ocr):
+                    sucessos += 1
+                else:
+                    falhas += 1
+
+        self.close()
 
         # Relatório final
         fim = datetime.now()
@@ -233,6 +802,136 @@ class PDFOCRProcessor:
             for failed in self.processing_log["failed_files"]:
                 print(f"  - {failed['file']}: {failed['error']}")
 
+    def _process_pdfs_parallel(self, pdf_files: List[Path], force_ocr: bool, workers: int) -> Tuple[int, int]:
+        """
+        Processa os PDFs em um pool de processos.
+
+        Só o processo principal lê e grava o log de processamento: os processos do pool apenas
+        extraem e salvam os textos, e devolvem o resultado de cada PDF.
+
+        Se um processo do pool morrer (ex.: falta de memória), o pool inteiro deixa de funcionar:
+        ele é recriado e os PDFs não terminados são reenviados. Um PDF que estava em processamento
+        em MAXIMO_QUEDAS_POOL_PDF quedas é dado como falho.
+
+        Returns:
+            Tupla (sucessos, falhas)
+        """
+        sucessos = 0
+        falhas = 0
+
+        # PDFs a processar: (caminho, hash do conteúdo)
+        pendentes = []
+        # PDFs com o mesmo conteúdo de outro deste lote: (caminho, hash, nome do PDF processado)
+        duplicados = []
+        nome_por_hash = {}
+        for pdf_file in pdf_files:
+            try:
+                hash_pdf = hash_arquivo(pdf_file)
+            except OSError as e:
+                print(f"❌ ERRO ao processar {pdf_file.name}: {str(e)}")
+                self._registrar_falha(pdf_file.stem, str(e))
+                falhas += 1
+                continue
+
+            if self._ja_processado(pdf_file, hash_pdf):
+                print(f"⏭️  {pdf_file.name} já processado anteriormente. Pulando...")
+                sucessos += 1
+                continue
+
+            nome_anterior = self._processado_com_outro_nome(pdf_file, hash_pdf)
+            if nome_anterior:
+                self._reaproveitar_texto(pdf_file, hash_pdf, nome_anterior)
+                sucessos += 1
+            elif hash_pdf in nome_por_hash:
+                # Copiado do texto do primeiro PDF no final, sem fazer o OCR duas vezes
+                duplicados.append((pdf_file, hash_pdf, nome_por_hash[hash_pdf]))
+            else:
+                nome_por_hash[hash_pdf] = pdf_file.stem
+                pendentes.append((pdf_file, hash_pdf))
+
+        if not pendentes:
+            return sucessos, falhas
+
+        print(f"🔧 Processando {len(pendentes)} PDFs em {min(workers, len(pendentes))} processos...")
+
+        fila = deque(pendentes)
+        quedas = {}
+        concluidos = 0
+
+        def registrar(pdf_file: Path, hash_pdf: str, erro: Optional[str]):
+            nonlocal sucessos, falhas, concluidos
+            concluidos += 1
+            pdf_name = pdf_file.stem
+            if erro is None:
+                self._registrar_sucesso(pdf_name, hash_pdf)
+                print(f"\n[{concluidos}/{len(pendentes)}] ✅ {pdf_name}.pdf → {pdf_name}.txt")
+                sucessos += 1
+            else:
+                self._registrar_falha(pdf_name, erro)
+                print(f"\n[{concluidos}/{len(pendentes)}] ❌ ERRO ao processar {pdf_name}.pdf: {erro}")
+                falhas += 1
+
+        while fila:
+            workers = min(workers, len(fila))
+            # "spawn" em vez de fork: o PaddlePaddle não funciona bem em processos criados por fork
+            with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_iniciar_pdf_worker,
+                    initargs=(
+                        str(self.input_dir), str(self.output_dir), self.ocr_dpi, self.ajustar_dpi, self.ocr_batch_size,
+                        # As CPUs são divididas entre os PDFs processados ao mesmo tempo
+                        max((os.cpu_count() or 1) // workers, 1),
+                        self.enable_hpi,
+                        self.use_gpu
+                    )
+            ) as executor:
+                # No máximo um PDF por processo no pool: se um processo morrer, só os PDFs que
+                # estavam em processamento ficam sob suspeita
+                em_andamento = {}
+                quebrado = False
+                while (fila or em_andamento) and not quebrado:
+                    while fila and len(em_andamento) < workers:
+                        pdf_file, hash_pdf = fila.popleft()
+                        em_andamento[executor.submit(_processar_pdf_worker, pdf_file, force_ocr)] = (pdf_file, hash_pdf)
+
+                    # Os resultados chegam na ordem em que os PDFs terminam
+                    prontos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                    quebrado = any(isinstance(futuro.exception(), BrokenProcessPool) for futuro in prontos)
+                    if quebrado:
+                        # Com o pool quebrado, os demais PDFs em processamento também terminam com erro
+                        prontos = list(em_andamento)
+                        wait(prontos)
+
+                    for futuro in prontos:
+                        pdf_file, hash_pdf = em_andamento.pop(futuro)
+                        try:
+                            erro = futuro.result()
+                        except BrokenProcessPool as e:
+                            quedas[pdf_file] = quedas.get(pdf_file, 0) + 1
+                            if quedas[pdf_file] < MAXIMO_QUEDAS_POOL_PDF:
+                                fila.appendleft((pdf_file, hash_pdf))
+                                continue
+                            erro = str(e)
+                        except Exception as e:
+                            erro = str(e) or type(e).__name__
+                        registrar(pdf_file, hash_pdf, erro)
+
+            if fila:
+                print(f"\n⚠️  Um processo do pool de PDFs morreu: reiniciando o pool para {len(fila)} PDF(s)...")
+
+        for pdf_file, hash_pdf, nome_original in duplicados:
+            if self._processado_com_outro_nome(pdf_file, hash_pdf):
+                self._reaproveitar_texto(pdf_file, hash_pdf, nome_original)
+                sucessos += 1
+            else:
+                erro = f"mesmo conteúdo de {nome_original}.pdf, que não foi processado"
+                self._registrar_falha(pdf_file.stem, erro)
+                print(f"❌ ERRO ao processar {pdf_file.name}: {erro}")
+                falhas += 1
+
+        return sucessos, falhas
+
     def get_text_from_processed_file(self, pdf_name: str) -> str:
         """
         Recupera o texto já processado de um PDF.
@@ -258,6 +957,24 @@ class PDFOCRProcessor:
 # ============================================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrai o texto dos PDFs dos ICAs (com OCR quando necessário)")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Número de PDFs processados em paralelo (padrão: número de CPUs, até 4; 1 com --gpu)"
+    )
+    parser.add_argument(
+        "--dpi", type=int, default=200,
+        help="Resolução das páginas enviadas ao OCR (padrão: 200, sobe para 300 se perder texto)"
+    )
+    parser.add_argument(
+        "--gpu", action="store_true",
+        help="Faz o OCR na GPU CUDA (TensorRT FP16)"
+    )
+    args = parser.parse_args()
+    # Com GPU, cada processo carregaria outra cópia dos modelos TensorRT na mesma placa
+    if args.workers is None:
+        args.workers = 1 if args.gpu else min(os.cpu_count() or 1, 4)
+
     # Configuração
     INPUT_DIR = r"C:\Coding\AirData\RepositorioSemantico\ICAS"
     OUTPUT_DIR = r"C:\Coding\AirData\RepositorioSemantico\textos_extraidos"
@@ -266,7 +983,8 @@ if __name__ == "__main__":
     processor = PDFOCRProcessor(
         input_dir=INPUT_DIR,
         output_dir=OUTPUT_DIR,
-        use_gpu=False  # Mude para True se tiver GPU CUDA disponível
+        use_gpu=args.gpu,  # Use --gpu se tiver GPU CUDA disponível
+        ocr_dpi=args.dpi
     )
 
     # OPÇÃO 1: Processar apenas 1 arquivo para teste
@@ -274,7 +992,7 @@ if __name__ == "__main__":
     # processor.process_single_pdf(pdf_path)
 
     # OPÇÃO 2: Processar todos os PDFs (modo produção)
-    processor.process_all_pdfs()
+    processor.process_all_pdfs(workers=args.workers)
 
     # OPÇÃO 3: Processar apenas os primeiros 5 PDFs (para teste)
     # processor.process_all_pdfs(max_files=5)
@@ -0,0 +1,37 @@
+"""Testes da extração de artigos do ICAJSONGenerator."""
+
+import pytest
+
+from ICAJSONGenerator import extrair_artigos_estruturados
+
+
+def test_cabecalho_entre_paginas():
+    """O nome de um cabeçalho que continua na página seguinte não é perdido."""
+    textos = [
+        "Art. 1º Texto do primeiro artigo.\nCAPÍTULO II -",
+        "DAS DISPOSIÇÕES FINAIS\nArt. 2º Texto do segundo artigo.",
+    ]
+
+    artigos = list(extrair_artigos_estruturados(textos, "ICA 96-1", "01-01-2020"))
+
+    assert [a["metadados"]["artigo"] for a in artigos] == ["Art. 1º", "Art. 2º"]
+    assert artigos[0]["metadados"]["contexto"]["capitulo"] is None
+    assert artigos[1]["metadados"]["contexto"]["capitulo"] == "CAPÍTULO II - DAS DISPOSIÇÕES FINAIS"
+    assert artigos[1]["texto"] == "Art. 2º Texto do segundo artigo."
+
+
+def test_artigo_entre_paginas():
+    """O texto de um artigo que atravessa a quebra de página fica completo."""
+    textos = [
+        "Art. 1º Começo do artigo",
+        "e fim do artigo.",
+    ]
+
+    artigos = list(extrair_artigos_estruturados(textos, "ICA 96-1", "01-01-2020"))
+
+    assert len(artigos) == 1
+    assert artigos[0]["texto"] == "Art. 1º Começo do artigo e fim do artigo."
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
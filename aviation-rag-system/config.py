@@ -13,237 +13,309 @@ Usage:
 """
 
 import os
+from dataclasses import MISSING, dataclass, fields
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Optional, Tuple
 
-from pydantic import Field
-from pydantic_settings import BaseSettings
+
+# ========================================
+# Environment Parsing
+# ========================================
+_TRUE_VALUES = {"1", "true", "t", "yes", "y", "on"}
+_FALSE_VALUES = {"0", "false", "f", "no", "n", "off"}
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean environment value (same spellings pydantic accepts)."""
+    lowered = value.lower()
+    if lowered in _TRUE_VALUES:
+        return True
+    if lowered in _FALSE_VALUES:
+        return False
+    raise ValueError(value)
 
 
-class Settings(BaseSettings):
-    """Application settings loaded from environment variables."""
+_CASTERS = {int: int, float: float, bool: _parse_bool}
+
+
+@lru_cache(maxsize=None)
+def _ensure_dir(directory: str) -> Path:
+    """Create a directory on first request; later calls for the same path skip the syscall."""
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _read_env_file(path: str) -> Dict[str, str]:
+    """
+    Read KEY=VALUE pairs from a dotenv file.
+
+    Blank lines and ``#`` comments are skipped, an ``export`` prefix is allowed
+    and matching surrounding quotes are removed.
+
+    Args:
+        path: Path to the dotenv file
+
+    Returns:
+        Dict[str, str]: Variables defined in the file (empty if it does not exist)
+    """
+    values = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return values
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):]
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        else:
+            # Inline comment after an unquoted value
+            value = value.split(" #", 1)[0].rstrip()
+        values[key.strip()] = value
+    return values
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Application settings loaded from environment variables.
+
+    Values come from the process environment, falling back to the ``.env`` file
+    and then to the defaults below. Use ``Settings.from_env()`` to build an instance.
+    """
 
     # ========================================
     # API Security
     # ========================================
-    API_KEY: str = Field(..., description="Secret API key for authentication")
-    CORS_ORIGINS: str = Field(
-        "http://localhost:3000,http://localhost:8080",
-        description="Comma-separated list of allowed CORS origins"
-    )
-    RATE_LIMIT: int = Field(100, description="Rate limit (requests per minute)")
+    API_KEY: str  # Secret API key for authentication
+    # Comma-separated list of allowed CORS origins
+    CORS_ORIGINS: str = "http://localhost:3000,http://localhost:8080"
+    RATE_LIMIT: int = 100  # Rate limit (requests per minute)
 
     # ========================================
     # Qdrant Configuration
     # ========================================
-    QDRANT_HOST: str = Field("localhost", description="Qdrant host")
-    QDRANT_PORT: int = Field(6333, description="Qdrant port")
-    QDRANT_COLLECTION_NAME: str = Field(
-        "aviation_regulations",
-        description="Qdrant collection name"
-    )
-    QDRANT_API_KEY: Optional[str] = Field(None, description="Qdrant Cloud API key")
+    QDRANT_HOST: str = "localhost"  # Qdrant host
+    QDRANT_PORT: int = 6333  # Qdrant port
+    QDRANT_COLLECTION_NAME: str = "aviation_regulations"  # Qdrant collection name
+    QDRANT_API_KEY: Optional[str] = None  # Qdrant Cloud API key
+    QDRANT_PREFER_GRPC: bool = True  # Use the gRPC API (faster for large vector payloads)
+    QDRANT_GRPC_PORT: int = 6334  # Qdrant gRPC port
 
     # ========================================
     # Ollama Configuration
     # ========================================
-    OLLAMA_HOST: str = Field(
-        "http://localhost:11434",
-        description="Ollama server URL"
-    )
-    OLLAMA_MODEL: str = Field("llama3.1:8b", description="Ollama model name")
+    OLLAMA_HOST: str = "http://localhost:11434"  # Ollama server URL
+    OLLAMA_MODEL: str = "llama3.1:8b"  # Ollama model name
+    OLLAMA_SKIP_PROBE: bool = False  # Skip the model availability check on LlamaModel init
 
     # LLM parameters
-    LLM_TEMPERATURE: float = Field(0.3, description="LLM temperature (0-1)")
-    LLM_TOP_P: float = Field(0.9, description="LLM top-p sampling")
-    LLM_MAX_TOKENS: int = Field(500, description="Maximum tokens in LLM response")
+    LLM_TEMPERATURE: float = 0.3  # LLM temperature (0-1)
+    LLM_TOP_P: float = 0.9  # LLM top-p sampling
+    LLM_MAX_TOKENS: int = 500  # Maximum tokens in LLM response
+    LLM_MAX_CONTEXT_TOKENS: int = 4096  # Maximum context tokens (words) sent in a RAG prompt
+    LLM_MAX_TOKENS_PER_DOC: int = 600  # Maximum tokens (words) per context document
+    LLM_KEEP_ALIVE: str = "30m"  # How long Ollama keeps the model (and its prompt cache) loaded
+    LLM_MAX_CONCURRENT_REQUESTS: int = 4  # Concurrent requests in generate_many()
 
     # ========================================
     # Embedding Model
     # ========================================
-    EMBEDDING_MODEL: str = Field(
-        "rufimelo/Legal-BERTimbau-sts-large-ma-v3",
-        description="HuggingFace embedding model name"
-    )
-    EMBEDDING_BATCH_SIZE: int = Field(32, description="Batch size for embeddings")
-    EMBEDDING_MAX_LENGTH: int = Field(512, description="Max sequence length")
-    EMBEDDING_DIMENSION: int = Field(1024, description="Embedding vector dimension")
+    # HuggingFace embedding model name
+    EMBEDDING_MODEL: str = "rufimelo/Legal-BERTimbau-sts-large-ma-v3"
+    EMBEDDING_BATCH_SIZE: int = 32  # Batch size for embeddings
+    EMBEDDING_MAX_LENGTH: int = 512  # Max sequence length
+    EMBEDDING_DIMENSION: int = 1024  # Embedding vector dimension
+    EMBEDDING_HALF_PRECISION: bool = True  # Run the embedding model in FP16 on CUDA
+    EMBEDDING_COMPILE: bool = True  # torch.compile the embedding model on CUDA
+    EMBEDDING_BACKEND: str = "torch"  # CPU inference backend: "torch" or "onnx" (int8-quantized)
+    EMBEDDING_QUANTIZE: bool = False  # int8 dynamic quantization of the PyTorch model on CPU
+    EMBEDDING_CACHE_ENABLED: bool = True  # Reuse embeddings of previously encoded texts
+    EMBEDDING_CACHE_DIR: str = "./models_cache/embeddings"  # Path to the on-disk embedding cache
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 500_000  # Embeddings kept in the cache (~1 GB at 1024 dims)
 
     # ========================================
     # Search Configuration
     # ========================================
-    SEARCH_TOP_K: int = Field(5, description="Number of top results to return")
-    SEARCH_SCORE_THRESHOLD: float = Field(
-        0.7,
-        description="Minimum similarity score (0-1)"
-    )
-    HNSW_EF_SEARCH: int = Field(64, description="HNSW ef parameter for search")
-    HNSW_M: int = Field(16, description="HNSW M parameter (connections per node)")
-    HNSW_EF_CONSTRUCT: int = Field(100, description="HNSW ef_construct parameter")
+    SEARCH_TOP_K: int = 5  # Number of top results to return
+    SEARCH_SCORE_THRESHOLD: float = 0.7  # Minimum similarity score (0-1)
+    HNSW_EF_SEARCH: int = 64  # HNSW ef parameter for search
+    HNSW_M: int = 16  # HNSW M parameter (connections per node)
+    HNSW_EF_CONSTRUCT: int = 100  # HNSW ef_construct parameter
 
     # ========================================
     # Chunking Configuration
     # ========================================
-    CHUNK_MAX_TOKENS: int = Field(512, description="Maximum tokens per chunk")
-    CHUNK_OVERLAP: int = Field(50, description="Overlap between chunks (tokens)")
+    CHUNK_MAX_TOKENS: int = 512  # Maximum tokens per chunk
+    CHUNK_OVERLAP: int = 50  # Overlap between chunks (tokens)
 
     # ========================================
     # Temporal Extraction
     # ========================================
-    DEFAULT_EFFECTIVE_DAYS: int = Field(
-        90,
-        description="Default days to add to publication date if no effective date found"
-    )
+    # Default days to add to publication date if no effective date found
+    DEFAULT_EFFECTIVE_DAYS: int = 90
 
     # ========================================
     # LexML Scraper Configuration
     # ========================================
-    LEXML_API_URL: str = Field(
-        "https://www.lexml.gov.br/sru",
-        description="LexML SRU API URL"
-    )
-    LEXML_MAX_RECORDS_PER_PAGE: int = Field(
-        100,
-        description="Maximum records per page in LexML API"
-    )
-    LEXML_KEYWORDS: str = Field(
-        "aviação,aeronave,ANAC,voo,tripulação,piloto,aeroporto",
-        description="Comma-separated keywords for aviation documents"
-    )
+    LEXML_API_URL: str = "https://www.lexml.gov.br/sru"  # LexML SRU API URL
+    LEXML_MAX_RECORDS_PER_PAGE: int = 100  # Maximum records per page in LexML API
+    LEXML_MAX_CONCURRENT_REQUESTS: int = 5  # Result pages fetched in parallel
+    # Comma-separated keywords for aviation documents
+    LEXML_KEYWORDS: str = "aviação,aeronave,ANAC,voo,tripulação,piloto,aeroporto"
 
     # ========================================
     # PDF Parser Configuration
     # ========================================
-    ENABLE_OCR: bool = Field(False, description="Enable OCR for scanned PDFs")
-    OCR_LANGUAGE: str = Field("por", description="OCR language code")
+    ENABLE_OCR: bool = False  # Enable OCR for scanned PDFs
+    OCR_LANGUAGE: str = "por"  # OCR language code
 
     # ========================================
     # Logging
     # ========================================
-    LOG_LEVEL: str = Field("INFO", description="Logging level")
-    LOG_FILE: str = Field("logs/aviation-rag.log", description="Log file path")
-    LOG_ROTATION: str = Field("500 MB", description="Log rotation size")
-    LOG_RETENTION: str = Field("30 days", description="Log retention period")
+    LOG_LEVEL: str = "INFO"  # Logging level
+    LOG_FILE: str = "logs/aviation-rag.log"  # Log file path
+    LOG_ROTATION: str = "500 MB"  # Log rotation size
+    LOG_RETENTION: str = "30 days"  # Log retention period
 
     # ========================================
     # Cache Configuration (Optional)
     # ========================================
-    REDIS_HOST: Optional[str] = Field(None, description="Redis host")
-    REDIS_PORT: int = Field(6379, description="Redis port")
-    REDIS_DB: int = Field(0, description="Redis database number")
-    CACHE_TTL: int = Field(3600, description="Cache TTL in seconds")
+    REDIS_HOST: Optional[str] = None  # Redis host
+    REDIS_PORT: int = 6379  # Redis port
+    REDIS_DB: int = 0  # Redis database number
+    CACHE_TTL: int = 3600  # Cache TTL in seconds
 
     # ========================================
     # Database Configuration (Optional)
     # ========================================
-    DATABASE_URL: Optional[str] = Field(
-        None,
-        description="PostgreSQL database URL for metadata storage"
-    )
+    DATABASE_URL: Optional[str] = None  # PostgreSQL database URL for metadata storage
 
     # ========================================
     # Monitoring (Optional)
     # ========================================
-    ENABLE_METRICS: bool = Field(False, description="Enable Prometheus metrics")
-    PROMETHEUS_PORT: int = Field(9091, description="Prometheus exporter port")
+    ENABLE_METRICS: bool = False  # Enable Prometheus metrics
+    PROMETHEUS_PORT: int = 9091  # Prometheus exporter port
 
     # ========================================
     # Development Settings
     # ========================================
-    ENVIRONMENT: str = Field("development", description="Environment: development | production")
-    DEBUG: bool = Field(True, description="Debug mode")
-    RELOAD: bool = Field(True, description="Reload on code changes")
+    ENVIRONMENT: str = "development"  # Environment: development | production
+    DEBUG: bool = True  # Debug mode
+    RELOAD: bool = True  # Reload on code changes
 
     # ========================================
     # Performance Tuning
     # ========================================
-    API_WORKERS: int = Field(4, description="Number of API workers (production)")
-    CUDA_VISIBLE_DEVICES: str = Field(
-        "0,1,2,3,4,5",
-        description="Comma-separated GPU device IDs"
-    )
+    API_WORKERS: int = 4  # Number of API workers (production)
+    CUDA_VISIBLE_DEVICES: str = "0,1,2,3,4,5"  # Comma-separated GPU device IDs
 
     # ========================================
     # Data Paths
     # ========================================
-    DATA_DIR: str = Field("./data", description="Path to store downloaded documents")
-    PROCESSED_DIR: str = Field(
-        "./data/processed",
-        description="Path to store processed documents"
-    )
-    MODEL_CACHE_DIR: str = Field(
-        "./models_cache",
-        description="Path to store model cache"
-    )
+    DATA_DIR: str = "./data"  # Path to store downloaded documents
+    PROCESSED_DIR: str = "./data/processed"  # Path to store processed documents
+    MODEL_CACHE_DIR: str = "./models_cache"  # Path to store model cache
 
     # ========================================
     # API Configuration
     # ========================================
-    API_HOST: str = Field("0.0.0.0", description="API host")
-    API_PORT: int = Field(8000, description="API port")
-    API_TITLE: str = Field("Aviation RAG API", description="API title")
-    API_VERSION: str = Field("1.0.0", description="API version")
-    API_DESCRIPTION: str = Field(
-        "Retrieval-Augmented Generation API for Brazilian Aviation Regulations",
-        description="API description"
-    )
+    API_HOST: str = "0.0.0.0"  # API host
+    API_PORT: int = 8000  # API port
+    API_TITLE: str = "Aviation RAG API"  # API title
+    API_VERSION: str = "1.0.0"  # API version
+    # API description
+    API_DESCRIPTION: str = "Retrieval-Augmented Generation API for Brazilian Aviation Regulations"
 
     # ========================================
     # Ingestion Configuration
     # ========================================
-    INGESTION_BATCH_SIZE: int = Field(
-        100,
-        description="Number of documents to process in batch"
-    )
-    ENABLE_PARALLEL_PROCESSING: bool = Field(
-        True,
-        description="Enable parallel processing"
-    )
-    NUM_WORKERS: int = Field(4, description="Number of parallel workers")
+    INGESTION_BATCH_SIZE: int = 100  # Number of documents to process in batch
+    ENABLE_PARALLEL_PROCESSING: bool = True  # Enable parallel processing
+    NUM_WORKERS: int = 4  # Number of parallel workers
 
     # ========================================
     # Advanced Settings
     # ========================================
-    LOG_QUERIES: bool = Field(True, description="Enable query logging")
-    ENABLE_PROFILING: bool = Field(False, description="Enable performance profiling")
-    LLM_TIMEOUT: int = Field(60, description="Timeout for LLM requests (seconds)")
-    SEARCH_TIMEOUT: int = Field(10, description="Timeout for vector search (seconds)")
-
-    class Config:
-        """Pydantic configuration."""
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
+    LOG_QUERIES: bool = True  # Enable query logging
+    ENABLE_PROFILING: bool = False  # Enable performance profiling
+    LLM_TIMEOUT: int = 60  # Timeout for LLM requests (seconds)
+    SEARCH_TIMEOUT: int = 10  # Timeout for vector search (seconds)
+
+    @classmethod
+    def from_env(cls, env_file: str = ".env") -> "Settings":
+        """
+        Build settings from environment variables and the ``.env`` file.
+
+        Args:
+            env_file: Path to the dotenv file (missing file is ignored)
+
+        Returns:
+            Settings: Populated settings
+
+        Raises:
+            ValueError: If a required variable is missing or a value has the wrong type
+        """
+        source = {**_read_env_file(env_file), **os.environ}
+        values = {}
+        for f in fields(cls):
+            raw = source.get(f.name)
+            if raw is None:
+                if f.default is MISSING:
+                    raise ValueError(f"{f.name}: required environment variable is not set")
+                continue
+            caster = _CASTERS.get(f.type)
+            try:
+                values[f.name] = caster(raw.strip()) if caster else raw
+            except ValueError:
+                raise ValueError(
+                    f"{f.name}: invalid value {raw!r} for type {f.type.__name__}"
+                ) from None
+        return cls(**values)
 
     # ========================================
     # Derived Properties
     # ========================================
-    @property
-    def cors_origins_list(self) -> List[str]:
+    # Computed once per process (cached_property stores the value in the instance __dict__,
+    # which is why the dataclass is not slotted). The parsed sequences are tuples because
+    # every caller shares the cached value
+    @cached_property
+    def cors_origins_list(self) -> Tuple[str, ...]:
         """Parse CORS origins from comma-separated string."""
-        return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
+        return tuple(origin.strip() for origin in self.CORS_ORIGINS.split(","))
 
-    @property
-    def lexml_keywords_list(self) -> List[str]:
+    @cached_property
+    def lexml_keywords_list(self) -> Tuple[str, ...]:
         """Parse LexML keywords from comma-separated string."""
-        return [kw.strip() for kw in self.LEXML_KEYWORDS.split(",")]
+        return tuple(kw.strip() for kw in self.LEXML_KEYWORDS.split(","))
 
-    @property
-    def cuda_devices_list(self) -> List[int]:
+    @cached_property
+    def cuda_devices_list(self) -> Tuple[int, ...]:
         """Parse CUDA device IDs from comma-separated string."""
         if not self.CUDA_VISIBLE_DEVICES:
-            return []
+            return ()
         try:
-            return [int(d.strip()) for d in self.CUDA_VISIBLE_DEVICES.split(",")]
+            return tuple(int(d.strip()) for d in self.CUDA_VISIBLE_DEVICES.split(","))
         except ValueError:
-            return []
+            return ()
 
-    @property
+    @cached_property
     def is_production(self) -> bool:
         """Check if running in production environment."""
         return self.ENVIRONMENT.lower() == "production"
 
-    @property
+    @cached_property
     def is_development(self) -> bool:
         """Check if running in development environment."""
         return self.ENVIRONMENT.lower() == "development"
@@ -251,44 +323,64 @@ class Settings(BaseSettings):
     # ========================================
     # Path Helpers
     # ========================================
+    @staticmethod
+    def _get_path(directory: str, filename: str = "") -> Path:
+        """Get path inside a directory, creating the directory once per process."""
+        path = _ensure_dir(directory)
+        return path / filename if filename else path
+
     def get_data_path(self, filename: str = "") -> Path:
         """Get path in data directory."""
-        path = Path(self.DATA_DIR)
-        path.mkdir(parents=True, exist_ok=True)
-        return path / filename if filename else path
+        return self._get_path(self.DATA_DIR, filename)
 
     def get_processed_path(self, filename: str = "") -> Path:
         """Get path in processed directory."""
-        path = Path(self.PROCESSED_DIR)
-        path.mkdir(parents=True, exist_ok=True)
-        return path / filename if filename else path
+        return self._get_path(self.PROCESSED_DIR, filename)
 
     def get_model_cache_path(self, filename: str = "") -> Path:
         """Get path in model cache directory."""
-        path = Path(self.MODEL_CACHE_DIR)
-        path.mkdir(parents=True, exist_ok=True)
-        return path / filename if filename else path
+        return self._get_path(self.MODEL_CACHE_DIR, filename)
 
     def get_log_path(self) -> Path:
         """Get log file path."""
         log_path = Path(self.LOG_FILE)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(str(log_path.parent))
         return log_path
 
 
 # ========================================
 # Global Configuration Instance
 # ========================================
-try:
-    config = Settings()
-except Exception as e:
-    # If .env file doesn't exist or has errors, provide helpful message
-    print(f"Error loading configuration: {e}")
-    print("\nPlease ensure:")
-    print("1. You have copied .env.example to .env")
-    print("2. All required environment variables are set in .env")
-    print("3. The .env file is in the project root directory")
-    raise
+_config: Optional[Settings] = None
+
+
+def get_config() -> Settings:
+    """
+    Return the global configuration, loading it on first use.
+
+    Returns:
+        Settings: Application settings
+    """
+    global _config
+    if _config is None:
+        try:
+            _config = Settings.from_env()
+        except Exception as e:
+            # If .env file doesn't exist or has errors, provide helpful message
+            print(f"Error loading configuration: {e}")
+            print("\nPlease ensure:")
+            print("1. You have copied .env.example to .env")
+            print("2. All required environment variables are set in .env")
+            print("3. The .env file is in the project root directory")
+            raise
+    return _config
+
+
+def __getattr__(name: str):
+    """Build ``config`` lazily on first access (PEP 562), so importing this module is free."""
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ========================================
@@ -301,6 +393,7 @@ def validate_config() -> bool:
     Returns:
         bool: True if configuration is valid, False otherwise
     """
+    config = get_config()
     issues = []
 
     # Check API key
@@ -346,11 +439,11 @@ def validate_config() -> bool:
 # ========================================
 # Helper Functions
 # ========================================
-def print_config():
-    """Print current configuration (excluding sensitive values)."""
-    print("\n" + "=" * 60)
-    print("Aviation RAG System Configuration")
-    print("=" * 60)
+@lru_cache(maxsize=None)
+def _render_config() -> str:
+    """Render the configuration summary (settings are immutable, so this runs once)."""
+    config = get_config()
+    lines = ["\n" + "=" * 60, "Aviation RAG System Configuration", "=" * 60]
 
     sections = {
         "Environment": [
@@ -385,11 +478,16 @@ def print_config():
     }
 
     for section_name, items in sections.items():
-        print(f"\n{section_name}:")
-        for key, value in items:
-            print(f"  {key:20s}: {value}")
+        lines.append(f"\n{section_name}:")
+        lines.extend(f"  {key:20s}: {value}" for key, value in items)
+
+    lines.append("\n" + "=" * 60 + "\n")
+    return "\n".join(lines)
+
 
-    print("\n" + "=" * 60 + "\n")
+def print_config():
+    """Print current configuration (excluding sensitive values)."""
+    print(_render_config())
 
 
 if __name__ == "__main__":
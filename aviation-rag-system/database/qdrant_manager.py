@@ -5,17 +5,66 @@ Handles all interactions with Qdrant vector database.
 """
 
 import uuid
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Dict, Iterable, List, Optional, Union
 
+import numpy as np
 from loguru import logger
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance, VectorParams, PointStruct, Filter, FieldCondition,
-    DatetimeRange, MatchValue, PayloadSchemaType, HnswConfigDiff
+    DatetimeRange, MatchValue, PayloadSchemaType, HnswConfigDiff, SearchParams
 )
 
 from config import config
 
+# Parallel uploads start a process pool per call, which only pays off once
+# every worker gets several batches
+PARALLEL_UPLOAD_MIN_BATCHES_PER_WORKER = 4
+
+
+@lru_cache(maxsize=None)
+def _shared_client(host: str, port: int, api_key: Optional[str]) -> QdrantClient:
+    """
+    Return the process-wide client for a Qdrant server.
+
+    Every QdrantManager pointing at the same server shares one client, so its
+    connection pool stays warm instead of being rebuilt per manager.
+    """
+    # gRPC serializes 1024-d vectors far more compactly than JSON
+    if api_key:
+        return QdrantClient(url=host, api_key=api_key, prefer_grpc=config.QDRANT_PREFER_GRPC)
+    return QdrantClient(
+        host=host,
+        port=port,
+        grpc_port=config.QDRANT_GRPC_PORT,
+        prefer_grpc=config.QDRANT_PREFER_GRPC
+    )
+
+
+@lru_cache(maxsize=512)
+def _temporal_filter(target_date: str) -> Filter:
+    """
+    Build the filter for active regulations valid on target_date.
+
+    Cached per date, since most queries ask about the same few dates; the
+    returned Filter is shared and must not be mutated.
+    """
+    return Filter(
+        must=[
+            FieldCondition(key="status", match=MatchValue(value="active")),
+            FieldCondition(key="effective_date", range=DatetimeRange(lte=target_date)),
+            {
+                "should": [
+                    FieldCondition(key="expiry_date", range=DatetimeRange(gte=target_date)),
+                    FieldCondition(key="expiry_date", match=MatchValue(value=None))
+                ]
+            }
+        ]
+    )
+
 
 class QdrantManager:
     """Manager for Qdrant vector database operations."""
@@ -41,11 +90,13 @@ class QdrantManager:
         self.collection_name = collection_name or config.QDRANT_COLLECTION_NAME
         self.api_key = api_key or config.QDRANT_API_KEY
 
-        # Initialize client
-        if self.api_key:
-            self.client = QdrantClient(url=self.host, api_key=self.api_key)
-        else:
-            self.client = QdrantClient(host=self.host, port=self.port)
+        # Initialize client (shared with other managers for the same server)
+        self.client = _shared_client(self.host, self.port, self.api_key)
+
+        # Search defaults, resolved once instead of on every query
+        self._search_params = SearchParams(hnsw_ef=config.HNSW_EF_SEARCH)
+        self._default_limit = config.SEARCH_TOP_K
+        self._default_threshold = config.SEARCH_SCORE_THRESHOLD
 
         logger.info(f"QdrantManager initialized ({self.host}:{self.port})")
 
@@ -70,8 +121,7 @@ class QdrantManager:
 
         try:
             # Check if collection exists
-            collections = self.client.get_collections().collections
-            exists = any(c.name == self.collection_name for c in collections)
+            exists = self.client.collection_exists(self.collection_name)
 
             if exists and not recreate:
                 logger.info(f"Collection '{self.collection_name}' already exists")
@@ -115,53 +165,77 @@ class QdrantManager:
             ("metadata.category", PayloadSchemaType.KEYWORD),
         ]
 
-        for field_name, schema_type in indexes:
-            try:
-                self.client.create_payload_index(
-                    collection_name=self.collection_name,
-                    field_name=field_name,
-                    field_schema=schema_type
-                )
-                logger.debug(f"Created index on '{field_name}'")
-            except Exception as e:
-                logger.warning(f"Could not create index on '{field_name}': {e}")
+        # Independent requests: send them concurrently instead of one round-trip after another
+        with ThreadPoolExecutor(max_workers=len(indexes)) as executor:
+            list(executor.map(lambda index: self._create_payload_index(*index), indexes))
+
+    def _create_payload_index(self, field_name: str, schema_type: PayloadSchemaType):
+        """Create a single payload index, logging (not raising) failures."""
+        try:
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=schema_type
+            )
+            logger.debug("Created index on '{}'", field_name)
+        except Exception as e:
+            logger.warning(f"Could not create index on '{field_name}': {e}")
 
     def upsert_points(
         self,
-        points: List[Dict],
+        points: Iterable[Dict],
         batch_size: int = 100
     ) -> bool:
         """
         Upsert points to collection.
 
+        PointStructs are built lazily and uploaded by qdrant-client's
+        upload_points (points may also be a generator). Batches are sent
+        from config.NUM_WORKERS parallel workers only for uploads large
+        enough to amortize starting them; a typical per-document upsert
+        runs in-process.
+
         Args:
-            points: List of point dictionaries with id, vector, payload
+            points: Point dictionaries with id, vector (list or numpy array), payload
             batch_size: Batch size for upload
 
         Returns:
             True if successful
         """
-        try:
-            # Convert to PointStruct
-            qdrant_points = []
+        total = 0
+
+        def point_structs():
+            nonlocal total
             for point in points:
-                point_id = point.get("id") or str(uuid.uuid4())
-                qdrant_points.append(PointStruct(
-                    id=point_id,
-                    vector=point["vector"],
+                total += 1
+                vector = point["vector"]
+                yield PointStruct(
+                    id=point.get("id") or str(uuid.uuid4()),
+                    # PointStruct validates a list of floats; ndarray.tolist() converts in C
+                    vector=vector.tolist() if isinstance(vector, np.ndarray) else vector,
                     payload=point.get("payload", {})
-                ))
-
-            # Upload in batches
-            for i in range(0, len(qdrant_points), batch_size):
-                batch = qdrant_points[i:i + batch_size]
-                self.client.upsert(
-                    collection_name=self.collection_name,
-                    points=batch
                 )
-                logger.debug(f"Uploaded batch {i//batch_size + 1}")
 
-            logger.success(f"Upserted {len(points)} points")
+        parallel = config.NUM_WORKERS if config.ENABLE_PARALLEL_PROCESSING else 1
+        if parallel > 1:
+            # Look ahead just far enough to know whether the upload is big enough
+            threshold = batch_size * parallel * PARALLEL_UPLOAD_MIN_BATCHES_PER_WORKER
+            points = iter(points)
+            head = list(islice(points, threshold))
+            if len(head) < threshold:
+                parallel = 1
+            points = chain(head, points)
+
+        try:
+            self.client.upload_points(
+                collection_name=self.collection_name,
+                points=point_structs(),
+                batch_size=batch_size,
+                parallel=parallel,
+                wait=True  # Points must be searchable once this returns
+            )
+
+            logger.success(f"Upserted {total} points")
             return True
 
         except Exception as e:
@@ -170,7 +244,7 @@ class QdrantManager:
 
     def search(
         self,
-        query_vector: List[float],
+        query_vector: Union[List[float], np.ndarray],
         limit: int = None,
         score_threshold: float = None,
         filters: Dict = None,
@@ -189,8 +263,8 @@ class QdrantManager:
         Returns:
             List of search results
         """
-        limit = limit or config.SEARCH_TOP_K
-        score_threshold = score_threshold or config.SEARCH_SCORE_THRESHOLD
+        limit = limit or self._default_limit
+        score_threshold = score_threshold or self._default_threshold
 
         try:
             results = self.client.search(
@@ -200,10 +274,10 @@ class QdrantManager:
                 score_threshold=score_threshold,
                 query_filter=filters,
                 with_payload=with_payload,
-                search_params={"hnsw_ef": config.HNSW_EF_SEARCH}
+                search_params=self._search_params
             )
 
-            logger.debug(f"Search returned {len(results)} results")
+            logger.debug("Search returned {} results", len(results))
             return results
 
         except Exception as e:
@@ -212,7 +286,7 @@ class QdrantManager:
 
     def search_temporal(
         self,
-        query_vector: List[float],
+        query_vector: Union[List[float], np.ndarray],
         target_date: str,
         limit: int = None,
         additional_filters: Dict = None
@@ -230,25 +304,14 @@ class QdrantManager:
             List of search results valid on target_date
         """
         # Build temporal filter
-        temporal_filter = Filter(
-            must=[
-                FieldCondition(key="status", match=MatchValue(value="active")),
-                FieldCondition(key="effective_date", range=DatetimeRange(lte=target_date)),
-                {
-                    "should": [
-                        FieldCondition(key="expiry_date", range=DatetimeRange(gte=target_date)),
-                        FieldCondition(key="expiry_date", match=MatchValue(value=None))
-                    ]
-                }
-            ]
-        )
+        temporal_filter = _temporal_filter(target_date)
 
-        # Merge with additional filters if provided
+        # Merge with additional filters if provided (into a new Filter: the cached one is shared)
         if additional_filters:
             if isinstance(additional_filters, Filter):
-                temporal_filter.must.extend(additional_filters.must or [])
+                temporal_filter = Filter(must=[*temporal_filter.must, *(additional_filters.must or [])])
             elif isinstance(additional_filters, dict):
-                temporal_filter.must.append(additional_filters)
+                temporal_filter = Filter(must=[*temporal_filter.must, additional_filters])
 
         return self.search(
             query_vector=query_vector,
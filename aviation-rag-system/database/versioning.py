@@ -49,20 +49,17 @@ class VersionManager:
                 logger.warning(f"Old version not found: {old_regulation_id} v{old_version}")
                 return False
 
-            # Update old version: mark as superseded
-            new_effective_date = new_version_data["payload"].get("effective_date")
-
-            for point in old_points:
-                updated_payload = point.payload.copy()
-                updated_payload["status"] = "superseded"
-                updated_payload["expiry_date"] = new_effective_date
-                updated_payload["superseded_by_version"] = new_version_data["payload"].get("version")
-
-                self.db.client.set_payload(
-                    collection_name=self.db.collection_name,
-                    payload=updated_payload,
-                    points=[point.id]
-                )
+            # Update old version: mark as superseded (set_payload merges these keys into
+            # the existing payload, so all points are updated in a single request)
+            self.db.client.set_payload(
+                collection_name=self.db.collection_name,
+                payload={
+                    "status": "superseded",
+                    "expiry_date": new_version_data["payload"].get("effective_date"),
+                    "superseded_by_version": new_version_data["payload"].get("version"),
+                },
+                points=[point.id for point in old_points]
+            )
 
             logger.info(f"Marked {len(old_points)} points as superseded")
 
@@ -77,8 +74,12 @@ class VersionManager:
             logger.error(f"Error superseding regulation: {e}")
             return False
 
-    def _find_regulation_points(self, regulation_id: str, version: str = None):
-        """Find points for a specific regulation and version."""
+    def _find_regulation_points(self, regulation_id: str, version: str = None, page_size: int = 256):
+        """
+        Find points for a specific regulation and version.
+
+        Pages through all matches; only point IDs are fetched (no payload or vectors).
+        """
         from qdrant_client.models import Filter, FieldCondition, MatchValue
 
         scroll_filter = Filter(
@@ -92,13 +93,20 @@ class VersionManager:
                 FieldCondition(key="version", match=MatchValue(value=version))
             )
 
-        results, _ = self.db.client.scroll(
-            collection_name=self.db.collection_name,
-            scroll_filter=scroll_filter,
-            limit=1000
-        )
-
-        return results
+        results = []
+        offset = None
+        while True:
+            page, offset = self.db.client.scroll(
+                collection_name=self.db.collection_name,
+                scroll_filter=scroll_filter,
+                limit=page_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False
+            )
+            results.extend(page)
+            if offset is None:
+                return results
 
 
 if __name__ == "__main__":
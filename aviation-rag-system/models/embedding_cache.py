@@ -0,0 +1,199 @@
+"""
+Persistent Embedding Cache for Aviation RAG System.
+
+Stores embeddings on disk keyed by a hash of (model, normalization, text), so
+re-ingesting the same regulatory chunks skips the model forward pass.
+
+Layout of the cache directory:
+    vectors.f16  - float16 rows of ``dimension`` values, appended in order
+    keys.bin     - 16-byte blake2b digests, one per row of vectors.f16
+    cache.lock   - lock file serializing writers across processes
+
+Several processes (e.g. API workers) may share a directory: appends happen
+under an exclusive file lock, and each process picks up the rows written by
+the others from keys.bin before reading or writing. Vectors are written before
+their keys, so a row is only visible once it is complete; rows left incomplete
+by an interrupted write are trimmed on the next open.
+
+Usage:
+    from models.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache("models_cache/embeddings", dimension=1024)
+    keys = [cache.key("model", True, text) for text in texts]
+    hits = cache.get(keys)
+"""
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+KEY_SIZE = 16
+CACHE_DTYPE = np.float16
+
+
+class EmbeddingCache:
+    """
+    Append-only on-disk embedding store with an in-memory key index.
+
+    Attributes:
+        path: Cache directory
+        dimension: Embedding vector dimension
+        max_entries: Maximum number of stored embeddings (None for no limit)
+    """
+
+    def __init__(self, path: str, dimension: int, max_entries: Optional[int] = None):
+        """
+        Open (or create) an embedding cache.
+
+        Args:
+            path: Cache directory
+            dimension: Embedding vector dimension
+            max_entries: Stop storing new embeddings once this many are cached
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dimension = dimension
+        self.max_entries = max_entries
+
+        self._vectors_file = self.path / "vectors.f16"
+        self._keys_file = self.path / "keys.bin"
+        self._lock_file = self.path / "cache.lock"
+        self._row_bytes = dimension * np.dtype(CACHE_DTYPE).itemsize
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self._index: Dict[bytes, int] = {}
+        self._rows = 0
+        self._full_logged = False
+
+        with self._file_lock():
+            self._trim_incomplete_rows()
+            self._sync_index()
+        logger.info(f"Embedding cache opened at {self.path} ({len(self._index)} vectors)")
+
+    @staticmethod
+    def key(model_name: str, normalize: bool, text: str) -> bytes:
+        """Cache key for a text embedded by a given model and normalization setting."""
+        return hashlib.blake2b(
+            f"{model_name}\0{int(normalize)}\0{text}".encode("utf-8"),
+            digest_size=KEY_SIZE
+        ).digest()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the cache directory, shared by all processes using it."""
+        with open(self._lock_file, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _trim_incomplete_rows(self):
+        """Cut both files back to their last complete common row (file lock held)."""
+        for file in (self._keys_file, self._vectors_file):
+            file.touch(exist_ok=True)
+
+        rows = min(
+            self._keys_file.stat().st_size // KEY_SIZE,
+            self._vectors_file.stat().st_size // self._row_bytes
+        )
+        for file, size in ((self._keys_file, rows * KEY_SIZE), (self._vectors_file, rows * self._row_bytes)):
+            if file.stat().st_size != size:
+                os.truncate(file, size)
+
+    def _sync_index(self):
+        """Add the keys appended since the last sync (by any process) to the index."""
+        rows = self._keys_file.stat().st_size // KEY_SIZE
+        if rows <= self._rows:
+            return
+
+        with open(self._keys_file, "rb") as f:
+            f.seek(self._rows * KEY_SIZE)
+            keys = f.read((rows - self._rows) * KEY_SIZE)
+        for i in range(rows - self._rows):
+            self._index.setdefault(keys[i * KEY_SIZE:(i + 1) * KEY_SIZE], self._rows + i)
+        self._rows = rows
+
+    def _vector_rows(self) -> np.memmap:
+        """Read-only memory map over the indexed vectors (remapped when rows are added)."""
+        if self._vectors is None or len(self._vectors) < self._rows:
+            self._vectors = np.memmap(
+                self._vectors_file, dtype=CACHE_DTYPE, mode="r", shape=(self._rows, self.dimension)
+            )
+        return self._vectors
+
+    def get(self, keys: List[bytes]) -> Dict[int, np.ndarray]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            keys: Cache keys (see key())
+
+        Returns:
+            Dict mapping positions in ``keys`` to float32 embeddings, for the hits only
+        """
+        with self._lock:
+            self._sync_index()
+            positions = [(i, self._index[k]) for i, k in enumerate(keys) if k in self._index]
+            if not positions:
+                return {}
+            vectors = self._vector_rows()[[row for _, row in positions]].astype(np.float32)
+        return {i: vector for (i, _), vector in zip(positions, vectors)}
+
+    def put(self, keys: List[bytes], embeddings: np.ndarray):
+        """
+        Append embeddings to the cache (keys already present are skipped).
+
+        Args:
+            keys: Cache keys, one per row of ``embeddings``
+            embeddings: Array of shape (len(keys), dimension)
+        """
+        with self._lock, self._file_lock():
+            # Rows written by other processes since our last sync come first
+            self._sync_index()
+
+            new = {}
+            for i, k in enumerate(keys):
+                if k not in self._index and k not in new:
+                    new[k] = i
+
+            if self.max_entries is not None and self._rows + len(new) > self.max_entries:
+                new = dict(list(new.items())[:max(self.max_entries - self._rows, 0)])
+                if not self._full_logged:
+                    logger.info(f"Embedding cache full ({self.max_entries} vectors); new embeddings are not stored")
+                    self._full_logged = True
+            if not new:
+                return
+
+            # Drop vectors whose keys were never written (interrupted append)
+            if self._vectors_file.stat().st_size != self._rows * self._row_bytes:
+                os.truncate(self._vectors_file, self._rows * self._row_bytes)
+
+            rows = np.ascontiguousarray(embeddings[list(new.values())], dtype=CACHE_DTYPE)
+            with open(self._vectors_file, "ab") as f:
+                f.write(rows.tobytes())
+            with open(self._keys_file, "ab") as f:
+                f.write(b"".join(new))
+
+            for offset, k in enumerate(new):
+                self._index[k] = self._rows + offset
+            self._rows += len(new)
+
+    def __len__(self) -> int:
+        """Number of cached embeddings."""
+        with self._lock:
+            self._sync_index()
+            return len(self._index)
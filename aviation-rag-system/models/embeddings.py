@@ -11,15 +11,23 @@ Usage:
     embeddings = model.encode(["texto 1", "texto 2"])
 """
 
+import math
+import queue
+import threading
 import time
+from pathlib import Path
 from typing import List, Union
 
 import numpy as np
 import torch
 from loguru import logger
-from sentence_transformers import SentenceTransformer
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
 
 from config import config
+from models.embedding_cache import CACHE_DTYPE, EmbeddingCache
+
+# Dynamic int8 quantization target for the ONNX backend (runs on any x86-64 CPU with AVX2)
+ONNX_QUANTIZATION = "avx2"
 
 
 class EmbeddingModel:
@@ -32,14 +40,22 @@ class EmbeddingModel:
     Attributes:
         model: The loaded SentenceTransformer model
         device: Device being used (cuda/cpu)
+        backend: Inference backend in use (torch/onnx)
+        quantized: Whether the PyTorch model was quantized to int8
         dimension: Embedding vector dimension
+        cache: On-disk embedding cache (None when disabled)
     """
 
     def __init__(
         self,
         model_name: str = None,
         device: str = None,
-        cache_dir: str = None
+        cache_dir: str = None,
+        use_embedding_cache: bool = None,
+        half_precision: bool = None,
+        compile_model: bool = None,
+        backend: str = None,
+        quantize: bool = None
     ):
         """
         Initialize embedding model.
@@ -47,7 +63,15 @@ class EmbeddingModel:
         Args:
             model_name: HuggingFace model name (default from config)
             device: Device to use ('cuda', 'cpu', or None for auto)
-            cache_dir: Directory to cache model (default from config)
+            cache_dir: Directory to cache model (default from config); when
+                given, the embedding cache is kept in its ``embeddings`` subdirectory
+            use_embedding_cache: Reuse embeddings stored on disk (default from config)
+            half_precision: Run the model in FP16 when on CUDA (default from config)
+            compile_model: torch.compile the model when on CUDA (default from config)
+            backend: 'torch', or 'onnx' to run an int8-quantized ONNX export
+                when on CPU (default from config)
+            quantize: int8 dynamic quantization of the Linear layers when
+                running the PyTorch backend on CPU (default from config)
         """
         self.model_name = model_name or config.EMBEDDING_MODEL
         self.cache_dir = cache_dir or str(config.get_model_cache_path())
@@ -62,16 +86,27 @@ class EmbeddingModel:
             self.device = "cpu"
             logger.warning("CUDA not available, using CPU (this will be slow)")
 
+        backend = backend or config.EMBEDDING_BACKEND
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown embedding backend: {backend}")
+        self.backend = "onnx" if backend == "onnx" and self.device == "cpu" else "torch"
+
         # Load model
-        logger.info(f"Loading embedding model: {self.model_name}")
+        logger.info(f"Loading embedding model: {self.model_name} (backend: {self.backend})")
         start_time = time.time()
 
         try:
-            self.model = SentenceTransformer(
-                self.model_name,
-                device=self.device,
-                cache_folder=self.cache_dir
-            )
+            if self.backend == "onnx":
+                self.model = self._load_onnx_model()
+            else:
+                # SDPA lets PyTorch dispatch BERT attention to its fused
+                # flash / memory-efficient kernels instead of the eager matmul-softmax
+                self.model = SentenceTransformer(
+                    self.model_name,
+                    device=self.device,
+                    cache_folder=self.cache_dir,
+                    model_kwargs={"attn_implementation": "sdpa"}
+                )
             load_time = time.time() - start_time
             logger.success(
                 f"Embedding model loaded successfully in {load_time:.2f}s "
@@ -81,6 +116,37 @@ class EmbeddingModel:
             logger.error(f"Failed to load embedding model: {e}")
             raise
 
+        # FP16 halves activation memory and runs on tensor cores; CPU inference stays FP32
+        if half_precision is None:
+            half_precision = config.EMBEDDING_HALF_PRECISION
+        if half_precision and self.device.startswith("cuda"):
+            self.model.half()
+            logger.info("Embedding model running in FP16")
+
+        # Inference only: no dropout, and no gradient bookkeeping on the weights
+        self.model.eval()
+        self.model.requires_grad_(False)
+
+        # Dynamic quantization stores Linear weights in int8 and quantizes activations
+        # on the fly, using the CPU's int8 dot-product instructions (VNNI on x86)
+        if quantize is None:
+            quantize = config.EMBEDDING_QUANTIZE
+        self.quantized = quantize and self.backend == "torch" and self.device == "cpu"
+        if self.quantized:
+            torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            logger.info("Embedding model quantized to int8 (dynamic)")
+
+        # Compiling fuses the transformer's small kernels; batches vary in sequence
+        # length, so shapes are compiled as dynamic to avoid a recompile per length.
+        # Compilation itself happens on the first forward pass.
+        if compile_model is None:
+            compile_model = config.EMBEDDING_COMPILE
+        if compile_model and self.device.startswith("cuda"):
+            self.model.forward = torch.compile(self.model.forward, dynamic=True)
+            logger.info("Embedding model compiled with torch.compile")
+
         # Get embedding dimension
         self.dimension = self.model.get_sentence_embedding_dimension()
         logger.info(f"Embedding dimension: {self.dimension}")
@@ -92,23 +158,79 @@ class EmbeddingModel:
                 f"config ({config.EMBEDDING_DIMENSION}). Updating config."
             )
 
+        # Persistent cache of computed embeddings; quantized vectors differ slightly
+        # from the full-precision ones, so they are cached under their own key
+        if self.backend == "onnx":
+            self._cache_model_id = f"{self.model_name}@onnx-qint8-{ONNX_QUANTIZATION}"
+        elif self.quantized:
+            self._cache_model_id = f"{self.model_name}@torch-qint8-dynamic"
+        else:
+            self._cache_model_id = self.model_name
+        if use_embedding_cache is None:
+            use_embedding_cache = config.EMBEDDING_CACHE_ENABLED
+        embedding_cache_dir = Path(cache_dir) / "embeddings" if cache_dir else config.EMBEDDING_CACHE_DIR
+        self.cache = (
+            EmbeddingCache(embedding_cache_dir, self.dimension, config.EMBEDDING_CACHE_MAX_ENTRIES)
+            if use_embedding_cache else None
+        )
+
+    def _load_onnx_model(self) -> SentenceTransformer:
+        """
+        Load the int8-quantized ONNX export of the model, exporting it on first use.
+
+        The export is kept under ``{cache_dir}/onnx/<model name>`` so later runs
+        load the quantized file directly.
+
+        Returns:
+            SentenceTransformer running on ONNX Runtime
+        """
+        export_dir = Path(self.cache_dir) / "onnx" / self.model_name.replace("/", "--")
+        file_name = f"onnx/model_qint8_{ONNX_QUANTIZATION}.onnx"
+
+        if not (export_dir / file_name).exists():
+            logger.info(f"Exporting {self.model_name} to ONNX (one-time) at {export_dir}")
+            exported = SentenceTransformer(
+                self.model_name,
+                device="cpu",
+                cache_folder=self.cache_dir,
+                backend="onnx"
+            )
+            exported.save_pretrained(str(export_dir))
+            export_dynamic_quantized_onnx_model(exported, ONNX_QUANTIZATION, str(export_dir))
+
+        return SentenceTransformer(
+            str(export_dir),
+            device="cpu",
+            backend="onnx",
+            model_kwargs={"file_name": file_name}
+        )
+
     def encode(
         self,
         texts: Union[str, List[str]],
         batch_size: int = None,
         show_progress: bool = False,
         normalize: bool = True,
-        convert_to_numpy: bool = True
+        convert_to_numpy: bool = True,
+        use_cache: bool = True
     ) -> Union[np.ndarray, torch.Tensor]:
         """
         Generate embeddings for input texts.
 
+        With the embedding cache enabled, numpy results are served from the cache
+        where possible and only the remaining texts go through the model. Cached
+        vectors are stored in float16, and freshly computed ones are rounded the
+        same way so results do not depend on the cache state. Repeated texts are
+        encoded once and their embedding is copied to every position.
+
         Args:
             texts: Single text or list of texts to encode
             batch_size: Batch size for processing (default from config)
             show_progress: Show progress bar for large batches
             normalize: Normalize embeddings to unit vectors
             convert_to_numpy: Return numpy array instead of torch tensor
+            use_cache: Go through the embedding cache (disable for one-off texts
+                such as search queries, so they are not stored)
 
         Returns:
             Embeddings as numpy array (n_texts, dimension) or torch tensor
@@ -135,15 +257,26 @@ class EmbeddingModel:
 
         start_time = time.time()
 
+        # Boilerplate (headers, repeated articles) goes through the model once
+        unique_texts = list(dict.fromkeys(texts))
+        inverse = None
+        if len(unique_texts) < len(texts):
+            position = {text: i for i, text in enumerate(unique_texts)}
+            inverse = np.fromiter((position[text] for text in texts), dtype=np.intp, count=len(texts))
+
         try:
-            embeddings = self.model.encode(
-                texts,
-                batch_size=batch_size,
-                show_progress_bar=show_progress,
-                normalize_embeddings=normalize,
-                convert_to_numpy=convert_to_numpy,
-                device=self.device
-            )
+            with torch.inference_mode():
+                if self.cache is not None and convert_to_numpy and use_cache:
+                    embeddings = self._encode_cached(unique_texts, batch_size, show_progress, normalize)
+                else:
+                    embeddings = self._encode_model(
+                        unique_texts, batch_size, show_progress, normalize, convert_to_numpy
+                    )
+
+            if inverse is not None:
+                if not convert_to_numpy:
+                    inverse = torch.as_tensor(inverse, device=embeddings.device)
+                embeddings = embeddings[inverse]
 
             encode_time = time.time() - start_time
             texts_per_second = len(texts) / encode_time if encode_time > 0 else 0
@@ -163,6 +296,164 @@ class EmbeddingModel:
             logger.error(f"Error encoding texts: {e}")
             raise
 
+    def _encode_model(
+        self,
+        texts: List[str],
+        batch_size: int,
+        show_progress: bool,
+        normalize: bool,
+        convert_to_numpy: bool
+    ) -> Union[np.ndarray, torch.Tensor]:
+        """
+        Run the model forward pass on all texts (numpy results are always float32).
+
+        For numpy output with more than one batch of texts, batches are built by
+        token budget instead of a fixed count: texts are sorted by token length and
+        each batch holds as many texts as fit in ``batch_size * max_seq_length``
+        tokens, so short texts go through in large batches while long articles keep
+        the configured batch size. On CUDA those batches go through _encode_pipelined().
+        """
+        if not convert_to_numpy or len(texts) <= batch_size:
+            # Without convert_to_tensor, SentenceTransformer returns a list of
+            # per-text tensors instead of one (n_texts, dimension) tensor
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=show_progress,
+                normalize_embeddings=normalize,
+                convert_to_numpy=convert_to_numpy,
+                convert_to_tensor=not convert_to_numpy,
+                device=self.device
+            )
+            if convert_to_numpy and embeddings.dtype != np.float32:
+                embeddings = embeddings.astype(np.float32)
+            return embeddings
+
+        max_length = self.model.max_seq_length
+        lengths = np.array([
+            len(ids) for ids in self.model.tokenizer(
+                texts, add_special_tokens=False, truncation=True, max_length=max_length
+            )["input_ids"]
+        ])
+        # Longest first, so an out-of-memory batch shows up immediately
+        order = np.argsort(-lengths, kind="stable")
+        token_budget = batch_size * max_length
+
+        buckets = []
+        start = 0
+        while start < len(order):
+            size = max(batch_size, token_budget // max(lengths[order[start]], 1))
+            buckets.append(order[start:start + size])
+            start += size
+
+        if self.device.startswith("cuda"):
+            embeddings = self._encode_pipelined(texts, buckets, normalize)
+        else:
+            embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+            for indices in buckets:
+                embeddings[indices] = self.model.encode(
+                    [texts[i] for i in indices],
+                    batch_size=len(indices),
+                    show_progress_bar=False,
+                    normalize_embeddings=normalize,
+                    convert_to_numpy=True,
+                    device=self.device
+                )
+
+        logger.debug("Encoded {} texts in {} length-bucketed batches", len(texts), len(buckets))
+        return embeddings
+
+    def _tokenize_batches(
+        self,
+        texts: List[str],
+        buckets: List[np.ndarray],
+        batches: "queue.Queue",
+        stop: threading.Event
+    ):
+        """Producer for _encode_pipelined(): tokenize each batch into pinned host memory."""
+        try:
+            for indices in buckets:
+                if stop.is_set():
+                    return
+                features = self.model.tokenize([texts[i] for i in indices])
+                batches.put({name: tensor.pin_memory() for name, tensor in features.items()})
+            batches.put(None)
+        except Exception as e:
+            batches.put(e)
+
+    def _encode_pipelined(
+        self,
+        texts: List[str],
+        buckets: List[np.ndarray],
+        normalize: bool
+    ) -> np.ndarray:
+        """
+        Encode pre-built batches on CUDA, keeping tokenization off the GPU's critical path.
+
+        A worker thread tokenizes the next batches into pinned memory (at most two
+        ahead) while the GPU runs the current one. Inputs are copied with
+        ``non_blocking=True`` and outputs stay on the GPU until the end, so
+        kernels are queued back to back with one device-to-host copy in total.
+        """
+        batches = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._tokenize_batches, args=(texts, buckets, batches, stop), daemon=True
+        )
+        producer.start()
+
+        outputs = []
+        try:
+            for batch in iter(batches.get, None):
+                if isinstance(batch, Exception):
+                    raise batch
+                features = {
+                    name: tensor.to(self.device, non_blocking=True) for name, tensor in batch.items()
+                }
+                embeddings = self.model(features)["sentence_embedding"]
+                if normalize:
+                    embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+                outputs.append(embeddings)
+            result = torch.cat(outputs).float().cpu().numpy()
+        finally:
+            # Unblock the producer if the forward pass failed with batches still queued
+            stop.set()
+            while producer.is_alive():
+                try:
+                    batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        embeddings[np.concatenate(buckets)] = result
+        return embeddings
+
+    def _encode_cached(
+        self,
+        texts: List[str],
+        batch_size: int,
+        show_progress: bool,
+        normalize: bool
+    ) -> np.ndarray:
+        """Encode distinct texts through the embedding cache, running the model only on misses."""
+        keys = [EmbeddingCache.key(self._cache_model_id, normalize, text) for text in texts]
+        hits = self.cache.get(keys)
+
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, vector in hits.items():
+            embeddings[i] = vector
+
+        misses = [i for i in range(len(texts)) if i not in hits]
+        if misses:
+            computed = self._encode_model(
+                [texts[i] for i in misses], batch_size, show_progress, normalize, True
+            ).astype(CACHE_DTYPE).astype(np.float32)
+            embeddings[misses] = computed
+            self.cache.put([keys[i] for i in misses], computed)
+
+        logger.debug("Embedding cache: {} hits, {} misses", len(hits), len(misses))
+        return embeddings
+
     def encode_batch(
         self,
         texts: List[str],
@@ -195,6 +486,9 @@ class EmbeddingModel:
         """
         Compute cosine similarity between two texts or embeddings.
 
+        Two texts are encoded in a single model call; the similarity itself is
+        three dot products (no separate norm passes).
+
         Args:
             text1: First text or embedding
             text2: Second text or embedding
@@ -210,21 +504,17 @@ class EmbeddingModel:
             ... )
             >>> print(f"Similarity: {score:.3f}")
         """
-        # Encode if strings
-        if isinstance(text1, str):
-            emb1 = self.encode(text1)
-        else:
-            emb1 = text1
-
-        if isinstance(text2, str):
-            emb2 = self.encode(text2)
+        # Encode if strings (ad-hoc texts are not stored in the embedding cache)
+        if isinstance(text1, str) and isinstance(text2, str):
+            emb1, emb2 = self.encode([text1, text2], use_cache=False)
         else:
-            emb2 = text2
+            emb1 = self.encode(text1, use_cache=False) if isinstance(text1, str) else text1
+            emb2 = self.encode(text2, use_cache=False) if isinstance(text2, str) else text2
 
-        # Compute cosine similarity
-        similarity = np.dot(emb1, emb2) / (
-            np.linalg.norm(emb1) * np.linalg.norm(emb2)
-        )
+        # Compute cosine similarity (in float32 even for half-precision inputs)
+        emb1 = np.ascontiguousarray(emb1, dtype=np.float32)
+        emb2 = np.ascontiguousarray(emb2, dtype=np.float32)
+        similarity = (emb1 @ emb2) / math.sqrt((emb1 @ emb1) * (emb2 @ emb2))
 
         return float(similarity)
 
@@ -251,24 +541,25 @@ class EmbeddingModel:
             >>> sim_matrix.shape
             (2, 3)
         """
-        # Encode both sets
-        emb1 = self.encode(texts1, show_progress=True)
+        # Encode both sets (ad-hoc texts are not stored in the embedding cache)
+        emb1 = self.encode(texts1, show_progress=True, use_cache=False)
 
         if texts2 is None:
             emb2 = emb1
         else:
-            emb2 = self.encode(texts2, show_progress=True)
+            emb2 = self.encode(texts2, show_progress=True, use_cache=False)
 
-        # Compute similarity matrix using cosine similarity
-        from sklearn.metrics.pairwise import cosine_similarity
-        similarity_matrix = cosine_similarity(emb1, emb2)
+        # Cosine similarity as a single matrix product of the row-normalized embeddings
+        emb1 = emb1 / np.linalg.norm(emb1, axis=1, keepdims=True)
+        emb2 = emb1 if texts2 is None else emb2 / np.linalg.norm(emb2, axis=1, keepdims=True)
+        similarity_matrix = emb1 @ emb2.T
 
         return similarity_matrix
 
     def __repr__(self) -> str:
         """String representation of the model."""
         return (
-            f"EmbeddingModel(model={self.model_name}, "
+            f"EmbeddingModel(model={self.model_name}, backend={self.backend}, "
             f"device={self.device}, dim={self.dimension})"
         )
 
@@ -345,10 +636,10 @@ if __name__ == "__main__":
 
     # Compute similarities
     print("\nSimilarity between texts:")
-    for i in range(len(texts)):
-        for j in range(i + 1, len(texts)):
-            sim = model.get_similarity(embeddings[i], embeddings[j])
-            print(f"Text {i+1} vs Text {j+1}: {sim:.3f}")
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    similarities = normalized @ normalized.T
+    for i, j in zip(*np.triu_indices(len(texts), k=1)):
+        print(f"Text {i+1} vs Text {j+1}: {similarities[i, j]:.3f}")
 
     # Test single text encoding
     print("\nEncoding single text...")
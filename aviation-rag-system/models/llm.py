@@ -10,14 +10,47 @@ Usage:
     response = llm.generate("Qual é a capital do Brasil?")
 """
 
+import asyncio
+import re
 import time
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
 
 import ollama
 from loguru import logger
 
 from config import config
 
+# Words, used as the token estimate for context truncation (as in pipeline.chunking)
+WORD_PATTERN = re.compile(r"\S+")
+
+# Default system prompt for RAG answers
+DEFAULT_RAG_SYSTEM_PROMPT = (
+    "Você é um assistente especializado em regulamentação de aviação civil brasileira. "
+    "Responda sempre em português, de forma clara e precisa, citando as fontes. "
+    "Seja factual e baseie suas respostas apenas nas informações fornecidas."
+)
+
+# RAG prompt: fixed instructions first, then the context, then the query, so
+# consecutive requests share the longest possible prefix in Ollama's prompt cache
+RAG_PROMPT_TEMPLATE = """Você é um assistente especializado em regulamentação de aviação civil brasileira.
+
+Sua tarefa é responder perguntas com base APENAS nas normas regulatórias fornecidas abaixo.
+Sempre cite a fonte (número da lei/regulamento e artigo) quando mencionar informações.
+
+Se a informação necessária para responder não estiver nas normas fornecidas, diga claramente
+que não encontrou a informação nos documentos disponíveis.
+
+=== NORMAS REGULATÓRIAS ===
+{context}
+
+=== PERGUNTA DO USUÁRIO ===
+{query}
+
+=== RESPOSTA ===
+Baseado nas normas fornecidas:
+"""
+
 
 class LlamaModel:
     """
@@ -29,9 +62,13 @@ class LlamaModel:
     Attributes:
         model_name: Name of the Ollama model
         host: Ollama server URL
+        client: Ollama client (keeps its HTTP connection alive across calls)
         default_options: Default generation options
     """
 
+    # Models available per Ollama host, filled by the first successful probe
+    _models_cache: Dict[str, List[str]] = {}
+
     def __init__(
         self,
         model_name: str = None,
@@ -55,6 +92,7 @@ class LlamaModel:
         self.temperature = temperature or config.LLM_TEMPERATURE
         self.top_p = top_p or config.LLM_TOP_P
         self.max_tokens = max_tokens or config.LLM_MAX_TOKENS
+        self.keep_alive = config.LLM_KEEP_ALIVE
 
         # Default generation options
         self.default_options = {
@@ -65,13 +103,36 @@ class LlamaModel:
 
         logger.info(f"Initializing LlamaModel: {self.model_name} @ {self.host}")
 
+        # One client per model so every request reuses the same connection
+        self.client = ollama.Client(host=self.host, timeout=config.LLM_TIMEOUT)
+        # Async client, recreated per event loop (see _get_async_client)
+        self._async_client: Optional[ollama.AsyncClient] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
         # Test connection
-        self._test_connection()
+        if not config.OLLAMA_SKIP_PROBE:
+            self._test_connection()
+
+    @classmethod
+    def invalidate_cache(cls, host: Optional[str] = None):
+        """
+        Forget the cached model list so the next instance probes Ollama again.
+
+        Args:
+            host: Ollama server URL (None clears every host)
+        """
+        if host is None:
+            cls._models_cache.clear()
+        else:
+            cls._models_cache.pop(host, None)
 
     def _test_connection(self) -> bool:
         """
         Test connection to Ollama server and model availability.
 
+        The model list is fetched once per host and shared by later instances
+        (see invalidate_cache()).
+
         Returns:
             bool: True if connection successful
 
@@ -80,13 +141,16 @@ class LlamaModel:
             ValueError: If model not available
         """
         try:
-            # List available models
-            logger.debug("Testing Ollama connection...")
-            models = ollama.list()
+            available_models = self._models_cache.get(self.host)
 
-            # Check if our model is available
-            available_models = [m["name"] for m in models.get("models", [])]
+            if available_models is None:
+                # List available models
+                logger.debug("Testing Ollama connection...")
+                models = self.client.list()
+                available_models = [m["name"] for m in models.get("models", [])]
+                self._models_cache[self.host] = available_models
 
+            # Check if our model is available
             if self.model_name not in available_models:
                 logger.warning(
                     f"Model '{self.model_name}' not found in Ollama. "
@@ -112,25 +176,165 @@ class LlamaModel:
             )
             raise ConnectionError(f"Cannot connect to Ollama: {e}")
 
+    def _build_options(
+        self,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Dict:
+        """
+        Build generation options from defaults and per-call overrides.
+
+        Args:
+            temperature: Override default temperature
+            top_p: Override default top_p
+            max_tokens: Override default max_tokens
+
+        Returns:
+            Ollama options dict
+        """
+        options = self.default_options.copy()
+        if temperature is not None:
+            options["temperature"] = temperature
+        if top_p is not None:
+            options["top_p"] = top_p
+        if max_tokens is not None:
+            options["num_predict"] = max_tokens
+        return options
+
+    def _build_messages(self, prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a single prompt.
+
+        Args:
+            prompt: Input prompt
+            system_prompt: Optional system message
+
+        Returns:
+            List of messages with 'role' and 'content'
+        """
+        messages = []
+
+        if system_prompt:
+            messages.append({
+                "role": "system",
+                "content": system_prompt
+            })
+
+        messages.append({
+            "role": "user",
+            "content": prompt
+        })
+
+        return messages
+
+    def _get_async_client(self) -> "ollama.AsyncClient":
+        """
+        Get the async Ollama client for the running event loop.
+
+        The underlying connection pool is bound to the loop it was created on,
+        so a new client is built whenever the loop changes (e.g. between
+        generate_many() calls).
+
+        Returns:
+            ollama.AsyncClient
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = ollama.AsyncClient(host=self.host, timeout=config.LLM_TIMEOUT)
+            self._async_client_loop = loop
+        return self._async_client
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Generate text from prompt, yielding it as the model decodes it.
+
+        Args:
+            prompt: Input prompt
+            system_prompt: Optional system message (e.g., role instructions)
+            temperature: Override default temperature
+            top_p: Override default top_p
+            max_tokens: Override default max_tokens
+
+        Yields:
+            Pieces of generated text, in order
+
+        Example:
+            >>> llm = LlamaModel()
+            >>> for piece in llm.generate_stream("Explique o que é RAG"):
+            ...     print(piece, end="", flush=True)
+        """
+        options = self._build_options(temperature, top_p, max_tokens)
+
+        logger.debug(
+            "Generating text (model={}, temp={}, max_tokens={})",
+            self.model_name, options["temperature"], options["num_predict"]
+        )
+
+        messages = self._build_messages(prompt, system_prompt)
+
+        start_time = time.time()
+        first_token_time = None
+        # Token count and decode time come from Ollama's final chunk
+        tokens_generated = 0
+        eval_duration = 0
+
+        try:
+            for chunk in self.client.chat(
+                model=self.model_name,
+                messages=messages,
+                options=options,
+                stream=True,
+                keep_alive=self.keep_alive
+            ):
+                content = chunk["message"]["content"]
+                if content:
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    yield content
+                if chunk.get("done"):
+                    tokens_generated = chunk.get("eval_count") or 0
+                    eval_duration = (chunk.get("eval_duration") or 0) / 1e9
+
+        except Exception as e:
+            logger.error(f"Error generating text: {e}")
+            raise
+
+        generation_time = time.time() - start_time
+        tokens_per_second = tokens_generated / eval_duration if eval_duration > 0 else 0
+
+        logger.debug(
+            "Generated {} tokens in {:.2f}s (first token after {:.2f}s, {:.1f} tokens/s)",
+            tokens_generated, generation_time, first_token_time or generation_time, tokens_per_second
+        )
+
     def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         top_p: Optional[float] = None,
-        max_tokens: Optional[int] = None,
-        stream: bool = False
+        max_tokens: Optional[int] = None
     ) -> str:
         """
         Generate text from prompt.
 
+        Collects generate_stream(); use that directly to consume the answer
+        as it is decoded.
+
         Args:
             prompt: Input prompt
             system_prompt: Optional system message (e.g., role instructions)
             temperature: Override default temperature
             top_p: Override default top_p
             max_tokens: Override default max_tokens
-            stream: Stream response (not implemented yet)
 
         Returns:
             Generated text
@@ -142,78 +346,135 @@ class LlamaModel:
             ...     system_prompt="Você é um assistente especializado em IA"
             ... )
         """
-        # Build options
-        options = self.default_options.copy()
-        if temperature is not None:
-            options["temperature"] = temperature
-        if top_p is not None:
-            options["top_p"] = top_p
-        if max_tokens is not None:
-            options["num_predict"] = max_tokens
-
-        logger.debug(
-            f"Generating text (model={self.model_name}, "
-            f"temp={options['temperature']}, "
-            f"max_tokens={options['num_predict']})"
-        )
-
-        start_time = time.time()
+        return "".join(self.generate_stream(
+            prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens
+        ))
 
-        try:
-            # Build messages
-            messages = []
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Generate text from prompt without blocking the event loop.
 
-            if system_prompt:
-                messages.append({
-                    "role": "system",
-                    "content": system_prompt
-                })
+        Args:
+            prompt: Input prompt
+            system_prompt: Optional system message (e.g., role instructions)
+            temperature: Override default temperature
+            top_p: Override default top_p
+            max_tokens: Override default max_tokens
 
-            messages.append({
-                "role": "user",
-                "content": prompt
-            })
+        Returns:
+            Generated text
+        """
+        options = self._build_options(temperature, top_p, max_tokens)
 
-            # Generate
-            response = ollama.chat(
+        try:
+            response = await self._get_async_client().chat(
                 model=self.model_name,
-                messages=messages,
+                messages=self._build_messages(prompt, system_prompt),
                 options=options,
-                stream=stream
-            )
-
-            # Extract text
-            generated_text = response["message"]["content"]
-
-            generation_time = time.time() - start_time
-            tokens_generated = len(generated_text.split())  # Rough estimate
-            tokens_per_second = tokens_generated / generation_time if generation_time > 0 else 0
-
-            logger.debug(
-                f"Generated {tokens_generated} tokens in {generation_time:.2f}s "
-                f"({tokens_per_second:.1f} tokens/s)"
+                keep_alive=self.keep_alive
             )
 
-            return generated_text
+            return response["message"]["content"]
 
         except Exception as e:
             logger.error(f"Error generating text: {e}")
             raise
 
+    async def agenerate_batch(
+        self,
+        prompts: List[str],
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> List[str]:
+        """
+        Generate text for several prompts concurrently.
+
+        Requests are sent in parallel (at most ``max_concurrency`` in flight)
+        so the Ollama server can batch their decoding.
+
+        Args:
+            prompts: Input prompts
+            max_concurrency: Maximum requests in flight (default from config)
+            **kwargs: Additional arguments for agenerate()
+
+        Returns:
+            Generated texts, in the same order as ``prompts``
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or config.LLM_MAX_CONCURRENT_REQUESTS)
+
+        async def generate_one(prompt: str) -> str:
+            async with semaphore:
+                return await self.agenerate(prompt, **kwargs)
+
+        start_time = time.time()
+        responses = await asyncio.gather(*(generate_one(prompt) for prompt in prompts))
+
+        logger.debug("Generated {} responses in {:.2f}s", len(responses), time.time() - start_time)
+
+        return list(responses)
+
+    def generate_many(
+        self,
+        prompts: List[str],
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> List[str]:
+        """
+        Generate text for several prompts concurrently (synchronous wrapper).
+
+        Must not be called from a running event loop; use agenerate_batch() there.
+
+        Args:
+            prompts: Input prompts
+            max_concurrency: Maximum requests in flight (default from config)
+            **kwargs: Additional arguments for agenerate()
+
+        Returns:
+            Generated texts, in the same order as ``prompts``
+
+        Example:
+            >>> llm = LlamaModel()
+            >>> responses = llm.generate_many(
+            ...     ["O que é RAG?", "O que é um vector database?"],
+            ...     temperature=0.3
+            ... )
+        """
+        return asyncio.run(self.agenerate_batch(prompts, max_concurrency=max_concurrency, **kwargs))
+
     def generate_with_context(
         self,
         query: str,
         context_documents: List[Dict],
         system_prompt: Optional[str] = None,
+        max_context_tokens: Optional[int] = None,
+        max_tokens_per_doc: Optional[int] = None,
         **kwargs
     ) -> str:
         """
         Generate text with retrieved context documents (RAG).
 
+        Documents are taken in retrieval order until ``max_context_tokens`` is
+        reached, each cut to ``max_tokens_per_doc``; the rest are left out of
+        the prompt to bound the prefill cost.
+
         Args:
             query: User query
-            context_documents: List of context documents with text and metadata
+            context_documents: List of context documents with text and metadata,
+                most relevant first
             system_prompt: Optional system prompt
+            max_context_tokens: Context token budget (default from config)
+            max_tokens_per_doc: Token limit per document (default from config)
             **kwargs: Additional arguments for generate()
 
         Returns:
@@ -231,7 +492,12 @@ class LlamaModel:
             ... )
         """
         # Build context string
-        context_str = self._build_context_string(context_documents)
+        documents = self._truncate_context(
+            context_documents,
+            max_context_tokens or config.LLM_MAX_CONTEXT_TOKENS,
+            max_tokens_per_doc or config.LLM_MAX_TOKENS_PER_DOC
+        )
+        context_str = self._build_context_string(documents)
 
         # Build prompt
         prompt = self._build_rag_prompt(query, context_str)
@@ -247,12 +513,59 @@ class LlamaModel:
             **kwargs
         )
 
+    def _truncate_context(
+        self,
+        documents: List[Dict],
+        max_context_tokens: int,
+        max_tokens_per_doc: int
+    ) -> List[Dict]:
+        """
+        Fit documents into the context token budget.
+
+        Tokens are estimated as whitespace-separated words. A document cut
+        short keeps its original formatting up to the last word kept.
+
+        Args:
+            documents: List of document dictionaries, most relevant first
+            max_context_tokens: Total token budget
+            max_tokens_per_doc: Token limit per document
+
+        Returns:
+            Documents that fit, with ``text`` truncated where needed
+        """
+        selected = []
+        remaining = max_context_tokens
+
+        for doc in documents:
+            limit = min(max_tokens_per_doc, remaining)
+            if limit <= 0:
+                break
+
+            text = doc.get("text", "")
+            words = list(islice(WORD_PATTERN.finditer(text), limit + 1))
+            if len(words) > limit:
+                doc = {**doc, "text": text[:words[limit - 1].end()] + " [...]"}
+                remaining -= limit
+            else:
+                remaining -= len(words)
+            selected.append(doc)
+
+        if len(selected) < len(documents):
+            logger.debug(
+                "Context budget of {} tokens reached: dropped {} of {} documents",
+                max_context_tokens, len(documents) - len(selected), len(documents)
+            )
+
+        return selected
+
     def _build_context_string(self, documents: List[Dict]) -> str:
         """
         Build formatted context string from documents.
 
+        Documents keep their retrieval order, so the most relevant ones come first.
+
         Args:
-            documents: List of document dictionaries
+            documents: List of document dictionaries, most relevant first
 
         Returns:
             Formatted context string
@@ -261,7 +574,8 @@ class LlamaModel:
 
         for i, doc in enumerate(documents, 1):
             text = doc.get("text", "")
-            reg_id = doc.get("regulation_id", f"documento-{i}")
+            # Search results carry regulation_id=None when the payload has none
+            reg_id = doc.get("regulation_id") or f"documento-{i}"
             version = doc.get("version", "")
 
             # Format document
@@ -285,24 +599,7 @@ class LlamaModel:
         Returns:
             Complete prompt
         """
-        prompt = f"""Você é um assistente especializado em regulamentação de aviação civil brasileira.
-
-Sua tarefa é responder perguntas com base APENAS nas normas regulatórias fornecidas abaixo.
-Sempre cite a fonte (número da lei/regulamento e artigo) quando mencionar informações.
-
-Se a informação necessária para responder não estiver nas normas fornecidas, diga claramente
-que não encontrou a informação nos documentos disponíveis.
-
-=== NORMAS REGULATÓRIAS ===
-{context}
-
-=== PERGUNTA DO USUÁRIO ===
-{query}
-
-=== RESPOSTA ===
-Baseado nas normas fornecidas:
-"""
-        return prompt
+        return RAG_PROMPT_TEMPLATE.format(context=context, query=query)
 
     def _get_default_rag_system_prompt(self) -> str:
         """
@@ -311,11 +608,7 @@ Baseado nas normas fornecidas:
         Returns:
             System prompt string
         """
-        return (
-            "Você é um assistente especializado em regulamentação de aviação civil brasileira. "
-            "Responda sempre em português, de forma clara e precisa, citando as fontes. "
-            "Seja factual e baseie suas respostas apenas nas informações fornecidas."
-        )
+        return DEFAULT_RAG_SYSTEM_PROMPT
 
     def chat(
         self,
@@ -345,22 +638,16 @@ Baseado nas normas fornecidas:
             ... ]
             >>> response = llm.chat(messages)
         """
-        # Build options
-        options = self.default_options.copy()
-        if temperature is not None:
-            options["temperature"] = temperature
-        if top_p is not None:
-            options["top_p"] = top_p
-        if max_tokens is not None:
-            options["num_predict"] = max_tokens
+        options = self._build_options(temperature, top_p, max_tokens)
 
-        logger.debug(f"Multi-turn chat ({len(messages)} messages)")
+        logger.debug("Multi-turn chat ({} messages)", len(messages))
 
         try:
-            response = ollama.chat(
+            response = self.client.chat(
                 model=self.model_name,
                 messages=messages,
-                options=options
+                options=options,
+                keep_alive=self.keep_alive
             )
 
             return response["message"]["content"]
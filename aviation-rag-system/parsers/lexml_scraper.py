@@ -10,36 +10,49 @@ Usage:
     documents = scraper.search(keywords=["aviação", "ANAC"], limit=100)
 """
 
-import time
-from typing import Dict, List, Optional
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
 from urllib.parse import quote
 
+import aiohttp
 import requests
 from loguru import logger
 from lxml import etree
 
 from config import config
 
+SRU_NAMESPACES = {
+    'srw': 'http://www.loc.gov/zing/srw/',
+    'dc': 'http://purl.org/dc/elements/1.1/'
+}
+
 
 class LexMLScraper:
     """Scraper for LexML Brasil SRU API."""
 
-    def __init__(self, api_url: str = None, max_records_per_page: int = None):
+    def __init__(
+        self,
+        api_url: str = None,
+        max_records_per_page: int = None,
+        max_concurrent_requests: int = None
+    ):
         """
         Initialize LexML scraper.
 
         Args:
             api_url: LexML SRU API URL
             max_records_per_page: Maximum records per page
+            max_concurrent_requests: Maximum result pages fetched in parallel
         """
         self.api_url = api_url or config.LEXML_API_URL
         self.max_records_per_page = max_records_per_page or config.LEXML_MAX_RECORDS_PER_PAGE
+        self.max_concurrent_requests = max_concurrent_requests or config.LEXML_MAX_CONCURRENT_REQUESTS
         self.session = requests.Session()
         logger.info(f"LexMLScraper initialized (API: {self.api_url})")
 
     def search(
         self,
-        keywords: List[str] = None,
+        keywords: Sequence[str] = None,
         doc_types: List[str] = None,
         authority_level: str = "federal",
         limit: int = 100,
@@ -48,6 +61,10 @@ class LexMLScraper:
         """
         Search for documents in LexML.
 
+        The first result page gives the total number of records; the remaining
+        pages are then fetched in parallel (at most ``max_concurrent_requests``
+        at a time). Must not be called from a running event loop.
+
         Args:
             keywords: Keywords to search (e.g., ["aviação", "ANAC"])
             doc_types: Document types (e.g., ["lei", "decreto"])
@@ -63,46 +80,97 @@ class LexMLScraper:
 
         logger.info(f"Searching LexML: {query} (limit={limit})")
 
-        documents = []
-        current_start = start_record
-
-        while len(documents) < limit:
-            records_to_fetch = min(self.max_records_per_page, limit - len(documents))
-
-            params = {
-                "operation": "searchRetrieve",
-                "version": "1.1",
-                "query": query,
-                "startRecord": current_start,
-                "maximumRecords": records_to_fetch
-            }
-
-            try:
-                response = self.session.get(self.api_url, params=params, timeout=30)
-                response.raise_for_status()
+        documents = asyncio.run(self._search_async(query, limit, start_record))
+        logger.info(f"Retrieved {len(documents)}/{limit} documents")
 
-                # Parse XML response
-                batch_docs = self._parse_sru_response(response.content)
+        return documents[:limit]
 
-                if not batch_docs:
-                    logger.info("No more documents found")
-                    break
+    async def _search_async(self, query: str, limit: int, start_record: int) -> List[Dict]:
+        """
+        Fetch all result pages for a query.
 
-                documents.extend(batch_docs)
-                logger.info(f"Retrieved {len(documents)}/{limit} documents")
+        Args:
+            query: SRU CQL query
+            limit: Maximum number of documents
+            start_record: Starting record number
 
-                current_start += len(batch_docs)
-                time.sleep(0.5)  # Rate limiting
+        Returns:
+            Documents in result order (pages that failed are skipped)
+        """
+        connector = aiohttp.TCPConnector(limit=self.max_concurrent_requests)
+        timeout = aiohttp.ClientTimeout(total=30)
 
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            first_page_size = min(self.max_records_per_page, limit)
+            try:
+                content = await self._fetch_page(session, query, start_record, first_page_size)
             except Exception as e:
                 logger.error(f"Error fetching documents: {e}")
-                break
+                return []
+
+            documents, total_records = self._parse_first_page(content)
+            if not documents:
+                logger.info("No documents found")
+                return []
+
+            end_record = start_record + limit
+            if total_records is not None:
+                end_record = min(end_record, total_records + 1)
+
+            offsets = range(start_record + first_page_size, end_record, self.max_records_per_page)
+            pages = await asyncio.gather(
+                *(
+                    self._fetch_page(
+                        session, query, offset, min(self.max_records_per_page, end_record - offset)
+                    )
+                    for offset in offsets
+                ),
+                return_exceptions=True
+            )
+
+        for offset, page in zip(offsets, pages):
+            if isinstance(page, Exception):
+                logger.error(f"Error fetching documents from record {offset}: {page}")
+                continue
+            documents.extend(self._parse_sru_response(page))
+
+        return documents
+
+    async def _fetch_page(
+        self,
+        session: aiohttp.ClientSession,
+        query: str,
+        start_record: int,
+        maximum_records: int
+    ) -> bytes:
+        """Fetch one SRU searchRetrieve page and return the raw XML."""
+        params = {
+            "operation": "searchRetrieve",
+            "version": "1.1",
+            "query": query,
+            "startRecord": start_record,
+            "maximumRecords": maximum_records
+        }
+
+        async with session.get(self.api_url, params=params) as response:
+            response.raise_for_status()
+            return await response.read()
 
-        return documents[:limit]
+    def _parse_first_page(self, xml_content: bytes) -> Tuple[List[Dict], Optional[int]]:
+        """Parse the first SRU page: its documents and the total number of records."""
+        documents = self._parse_sru_response(xml_content)
+
+        try:
+            root = etree.fromstring(xml_content)
+            total = root.xpath('string(//srw:numberOfRecords)', namespaces=SRU_NAMESPACES)
+            return documents, int(total) if total else None
+        except Exception as e:
+            logger.warning(f"Could not read numberOfRecords from SRU response: {e}")
+            return documents, None
 
     def _build_query(
         self,
-        keywords: List[str],
+        keywords: Sequence[str],
         doc_types: List[str] = None,
         authority_level: str = "federal"
     ) -> str:
@@ -130,16 +198,12 @@ class LexMLScraper:
         """Parse SRU XML response."""
         try:
             root = etree.fromstring(xml_content)
-            namespaces = {
-                'srw': 'http://www.loc.gov/zing/srw/',
-                'dc': 'http://purl.org/dc/elements/1.1/'
-            }
 
-            records = root.xpath('//srw:record', namespaces=namespaces)
+            records = root.xpath('//srw:record', namespaces=SRU_NAMESPACES)
             documents = []
 
             for record in records:
-                doc = self._parse_record(record, namespaces)
+                doc = self._parse_record(record, SRU_NAMESPACES)
                 if doc:
                     documents.append(doc)
 
@@ -34,18 +34,19 @@ class TemporalExtractor:
 
     def __init__(self):
         """Initialize temporal extractor with regex patterns."""
-        # Patterns for effective dates
+        # Patterns for effective dates, each paired with a literal keyword
+        # that must be present in the (lowercased) text for the pattern to match
         self.effective_patterns = [
             # "entra em vigor em 15/06/2023"
-            r"entra(?:rá)?\s+em\s+vigor\s+(?:em|na data de|a partir de)?\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
+            ("entra", r"entra(?:rá)?\s+em\s+vigor\s+(?:em|na data de|a partir de)?\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"),
             # "vigência a partir de 01/01/2024"
-            r"vigência\s+a\s+partir\s+de\s+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
+            ("vigência", r"vigência\s+a\s+partir\s+de\s+(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"),
             # "produzirá efeitos a partir de"
-            r"produzirá\s+efeitos?\s+(?:a\s+partir\s+de)?\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
+            ("produzirá", r"produzirá\s+efeitos?\s+(?:a\s+partir\s+de)?\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"),
             # "passa a vigorar em"
-            r"passa\s+a\s+vigorar\s+(?:em|na data de)?\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
+            ("vigorar", r"passa\s+a\s+vigorar\s+(?:em|na data de)?\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"),
             # "publicação" (will add default days)
-            r"(?:após|da)\s+(?:sua\s+)?publicação",
+            ("publicação", r"(?:após|da)\s+(?:sua\s+)?publicação"),
         ]
 
         # Patterns for revocation dates
@@ -128,7 +129,7 @@ class TemporalExtractor:
                 f"{config.DEFAULT_EFFECTIVE_DAYS} days"
             )
 
-        logger.debug(f"Extracted dates: {result}")
+        logger.debug("Extracted dates: {}", result)
         return result
 
     def _extract_effective_date(
@@ -146,8 +147,13 @@ class TemporalExtractor:
         Returns:
             Effective date in ISO format or None
         """
-        # Try each pattern
-        for pattern in self.effective_patterns:
+        text_lower = text.lower()
+
+        # Try each pattern, skipping the regex when its keyword is absent
+        for keyword, pattern in self.effective_patterns:
+            if keyword not in text_lower:
+                continue
+
             match = re.search(pattern, text, re.IGNORECASE)
             if match:
                 # Check if pattern has a date group
@@ -155,7 +161,7 @@ class TemporalExtractor:
                     date_str = match.group(1)
                     parsed_date = self._parse_date(date_str)
                     if parsed_date:
-                        logger.debug(f"Found effective date: {parsed_date}")
+                        logger.debug("Found effective date: {}", parsed_date)
                         return parsed_date
                 else:
                     # Pattern like "após publicação" - use publication date
@@ -192,7 +198,7 @@ class TemporalExtractor:
                     date_str = date_match.group(0)
                     parsed_date = self._parse_date(date_str)
                     if parsed_date:
-                        logger.debug(f"Found revocation date: {parsed_date}")
+                        logger.debug("Found revocation date: {}", parsed_date)
                         return parsed_date
 
         return None
@@ -278,7 +284,7 @@ class TemporalExtractor:
                 doc_type = match.group(1).lower()
                 doc_number = match.group(2)
                 result["amends"] = f"{doc_type}-{doc_number}"
-                logger.debug(f"Document amends: {result['amends']}")
+                logger.debug("Document amends: {}", result['amends'])
                 break
 
         return result
@@ -300,7 +306,7 @@ class TemporalExtractor:
             if parsed:
                 dates.append(parsed)
 
-        logger.debug(f"Found {len(dates)} dates in text")
+        logger.debug("Found {} dates in text", len(dates))
         return dates
 
 
@@ -56,7 +56,7 @@ class ArticleChunker:
             chunk = self._create_chunk(article, '\n\n'.join(current_chunk), len(chunks))
             chunks.append(chunk)
 
-        logger.debug(f"Split article into {len(chunks)} chunks")
+        logger.debug("Split article into {} chunks", len(chunks))
         return chunks
 
     def _create_chunk(self, article: Dict, text: str, chunk_idx: int) -> Dict:
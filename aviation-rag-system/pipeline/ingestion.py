@@ -44,7 +44,7 @@ class IngestionPipeline:
                 for chunk, embedding in zip(chunks, embeddings):
                     points.append({
                         "id": chunk.get("regulation_id"),
-                        "vector": embedding.tolist(),
+                        "vector": embedding,
                         "payload": chunk
                     })
 
@@ -72,7 +72,7 @@ class IngestionPipeline:
                 for section, embedding in zip(sections, embeddings):
                     points.append({
                         "id": section.get("regulation_id"),
-                        "vector": embedding.tolist(),
+                        "vector": embedding,
                         "payload": section
                     })
 
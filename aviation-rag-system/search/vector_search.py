@@ -35,12 +35,12 @@ class VectorSearch:
         Returns:
             List of results with metadata
         """
-        # Embed query
-        query_vector = self.embedding_model.encode(query)
+        # Embed query (queries are not worth keeping in the embedding cache)
+        query_vector = self.embedding_model.encode(query, use_cache=False)
 
         # Search
         results = self.db.search(
-            query_vector=query_vector.tolist(),
+            query_vector=query_vector,
             limit=limit or config.SEARCH_TOP_K,
             score_threshold=score_threshold or config.SEARCH_SCORE_THRESHOLD,
             filters=filters
@@ -79,10 +79,10 @@ class VectorSearch:
         Returns:
             List of results valid on date
         """
-        query_vector = self.embedding_model.encode(query)
+        query_vector = self.embedding_model.encode(query, use_cache=False)
 
         results = self.db.search_temporal(
-            query_vector=query_vector.tolist(),
+            query_vector=query_vector,
             target_date=date,
             limit=limit or config.SEARCH_TOP_K
         )
@@ -2,7 +2,9 @@
 
 import pytest
 import numpy as np
+import torch
 from models.embeddings import EmbeddingModel
+from models.embedding_cache import EmbeddingCache
 
 
 @pytest.fixture
@@ -29,6 +31,25 @@ def test_batch_encoding(model):
     assert embeddings.shape == (3, 1024)
 
 
+def test_duplicate_texts(model):
+    """Test that repeated texts get the same embedding at every position."""
+    texts = ["Lei 1", "Lei 2", "Lei 1"]
+    embeddings = model.encode(texts)
+
+    assert embeddings.shape == (3, 1024)
+    assert np.array_equal(embeddings[0], embeddings[2])
+
+
+def test_duplicate_texts_tensor(model):
+    """Test deduplication when returning a torch tensor."""
+    texts = ["Lei 1", "Lei 2", "Lei 1"]
+    embeddings = model.encode(texts, convert_to_numpy=False)
+
+    assert isinstance(embeddings, torch.Tensor)
+    assert embeddings.shape == (3, 1024)
+    assert torch.equal(embeddings[0], embeddings[2])
+
+
 def test_similarity(model):
     """Test similarity computation."""
     text1 = "aviação civil"
@@ -39,5 +60,43 @@ def test_similarity(model):
     assert 0.0 <= sim <= 1.0
 
 
+def test_embedding_cache_persists(tmp_path):
+    """Test that cached embeddings survive reopening the cache."""
+    cache = EmbeddingCache(str(tmp_path), dimension=4)
+    keys = [EmbeddingCache.key("model", True, text) for text in ["Lei 1", "Lei 2"]]
+    cache.put(keys, np.array([[1, 2, 3, 4], [5, 6, 7, 8]], dtype=np.float32))
+
+    reopened = EmbeddingCache(str(tmp_path), dimension=4)
+    hits = reopened.get(keys + [EmbeddingCache.key("model", True, "Lei 3")])
+
+    assert sorted(hits) == [0, 1]
+    assert np.array_equal(hits[1], [5, 6, 7, 8])
+
+
+def test_embedding_cache_shared_between_instances(tmp_path):
+    """Test that two instances on one directory (e.g. two workers) keep rows aligned."""
+    first = EmbeddingCache(str(tmp_path), dimension=4)
+    second = EmbeddingCache(str(tmp_path), dimension=4)
+    key_a = EmbeddingCache.key("model", True, "A")
+    key_b = EmbeddingCache.key("model", True, "B")
+
+    first.put([key_a], np.array([[1, 1, 1, 1]], dtype=np.float32))
+    second.put([key_b], np.array([[2, 2, 2, 2]], dtype=np.float32))
+
+    assert np.array_equal(first.get([key_a])[0], [1, 1, 1, 1])
+    assert np.array_equal(first.get([key_b])[0], [2, 2, 2, 2])
+    assert np.array_equal(second.get([key_a])[0], [1, 1, 1, 1])
+
+
+def test_embedding_cache_max_entries(tmp_path):
+    """Test that the cache stops storing embeddings once full."""
+    cache = EmbeddingCache(str(tmp_path), dimension=4, max_entries=2)
+    keys = [EmbeddingCache.key("model", True, f"Lei {i}") for i in range(3)]
+    cache.put(keys, np.ones((3, 4), dtype=np.float32))
+
+    assert len(cache) == 2
+    assert sorted(cache.get(keys)) == [0, 1]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -15,6 +15,16 @@ def test_temporal_extractor():
     assert dates["is_revoked"] == False
 
 
+def test_no_effective_date_without_keywords():
+    """Test that texts without effective-date keywords yield no date."""
+    extractor = TemporalExtractor()
+
+    text = "Art. 1º Esta lei estabelece normas sobre aviação civil."
+    dates = extractor.extract_dates(text)
+
+    assert dates["effective_date"] is None
+
+
 def test_revocation_detection():
     """Test revocation detection."""
     extractor = TemporalExtractor()